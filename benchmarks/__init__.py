@@ -0,0 +1,30 @@
+"""Benchmarks for the MyFuelPortal integration."""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+from types import ModuleType
+
+_PACKAGE = "custom_components.myfuelportal"
+
+
+def register_client_package() -> None:
+    """Make the parser and API client importable without Home Assistant.
+
+    Used by the benchmarks and by tools.poll_accounts.
+
+    The integration package imports Home Assistant when it is imported,
+    while the parser and API client only need BeautifulSoup and aiohttp.
+    When Home Assistant is not installed, the package is registered as a
+    plain namespace, so its modules import without running its __init__.
+    """
+    if importlib.util.find_spec("homeassistant") is not None:
+        return
+    root = Path(__file__).resolve().parent.parent / "custom_components"
+    for name, path in (("custom_components", root), (_PACKAGE, root / "myfuelportal")):
+        if name not in sys.modules:
+            module = ModuleType(name)
+            module.__path__ = [str(path)]
+            sys.modules[name] = module
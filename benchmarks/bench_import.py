@@ -0,0 +1,141 @@
+"""Cold import time of the MyFuelPortal integration.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --runs 20 --max-ms 50
+
+Each module is imported in a fresh interpreter, so nothing is cached but
+the bytecode, and the import is timed along with the first and second
+Tank page parse afterwards, which pay for the parser dependencies and
+patterns that are loaded on first use. The median of the runs is reported.
+
+The run fails if importing left BeautifulSoup loaded or any regular
+expression compiled, or if the median import takes longer than --max-ms.
+Without Home Assistant only the API client modules can be imported; the
+package __init__, which imports Home Assistant, is then bypassed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Registers the integration package as a namespace, so its client modules
+# import without the package __init__
+_BYPASS_PACKAGE_INIT = """
+import types
+for name, path in (
+    ("custom_components", "custom_components"),
+    ("custom_components.myfuelportal", "custom_components/myfuelportal"),
+):
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    sys.modules[name] = module
+"""
+
+_RUN = """
+import json, logging, sys, time
+{preamble}
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+
+from custom_components.myfuelportal.patterns import PATTERNS
+result = {{
+    "import_s": imported,
+    "bs4_loaded": "bs4" in sys.modules,
+    "patterns": PATTERNS.as_dict(),
+    "modules": len(sys.modules),
+}}
+
+from custom_components.myfuelportal.parser import parse_tank_page
+from benchmarks.corpus import tank_page
+html = tank_page("import").html
+logging.disable(logging.WARNING)
+for key in ("first_parse_s", "second_parse_s"):
+    start = time.perf_counter()
+    parse_tank_page(html)
+    result[key] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+
+def measure(module: str, bypass: bool) -> dict[str, Any]:
+    """Import a module in a fresh interpreter and return its timings."""
+    code = _RUN.format(
+        module=module, preamble=_BYPASS_PACKAGE_INIT if bypass else ""
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=_ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and return the process exit code."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument(
+        "--module", action="append", help="modules to import, instead of the defaults"
+    )
+    arg_parser.add_argument(
+        "--max-ms", type=float, help="fail if the median import takes longer than this"
+    )
+    args = arg_parser.parse_args(argv)
+
+    with_home_assistant = importlib.util.find_spec("homeassistant") is not None
+    modules = args.module or (
+        ["custom_components.myfuelportal", "custom_components.myfuelportal.api"]
+        if with_home_assistant
+        else ["custom_components.myfuelportal.api"]
+    )
+    if not with_home_assistant:
+        print("Home Assistant is not installed, bypassing the package __init__")
+
+    failures = []
+    print(
+        f"{'module':<38} {'import ms':>10} {'1st parse ms':>13} "
+        f"{'2nd parse ms':>13} {'modules':>8}"
+    )
+    for module in modules:
+        # The first run compiles the bytecode and is left out
+        measure(module, not with_home_assistant)
+        runs = [measure(module, not with_home_assistant) for _ in range(args.runs)]
+        median = {
+            key: statistics.median(run[key] for run in runs) * 1000
+            for key in ("import_s", "first_parse_s", "second_parse_s")
+        }
+        print(
+            f"{module:<38} {median['import_s']:>10.1f} "
+            f"{median['first_parse_s']:>13.1f} {median['second_parse_s']:>13.1f} "
+            f"{runs[0]['modules']:>8}"
+        )
+        if any(run["bs4_loaded"] for run in runs):
+            failures.append(f"LOADED {module}: importing it loaded BeautifulSoup")
+        if compiled := max(run["patterns"]["compiled"] for run in runs):
+            failures.append(
+                f"LOADED {module}: importing it compiled {compiled} patterns"
+            )
+        if args.max_ms and median["import_s"] > args.max_ms:
+            failures.append(f"SLOW {module}: {median['import_s']:.1f} ms")
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
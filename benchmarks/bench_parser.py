@@ -0,0 +1,234 @@
+"""Benchmark and correctness gate for the MyFuelPortal page parser.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser --backend all --iterations 50
+
+Every page of the synthetic corpus is parsed and checked against its golden
+values first, both whole and as read by the streaming reader; a mismatch
+fails the run. Each extraction stage is then timed and reported as mean
+milliseconds and operations per second, along with the peak memory of a
+full parse, whole and streamed.
+
+Only the parser is used, so Home Assistant does not need to be installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import logging
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from . import register_client_package
+
+register_client_package()
+
+# pylint: disable=wrong-import-position
+from custom_components.myfuelportal import parser  # noqa: E402
+
+from .corpus import Page, corpus  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+# Chunk size of the streamed reads, as used by the API client
+_CHUNK_SIZE = 16 * 1024
+
+
+def streamed(html: str) -> str:
+    """Return the part of a page the streaming reader keeps."""
+    reader = parser.TankPageReader()
+    for start in range(0, len(html), _CHUNK_SIZE):
+        if reader.feed(html[start : start + _CHUNK_SIZE]):
+            break
+    return reader.html
+
+
+def _tank_stages(page: Page, backend: str) -> list[tuple[str, Callable[[], Any]]]:
+    """Return the Tank page stages, each run on a freshly built document."""
+    state: dict[str, Any] = {}
+
+    def build() -> None:
+        state["visitor"] = parser._TankPageVisitor()  # pylint: disable=protected-access
+        state["document"] = parser._parse(  # pylint: disable=protected-access
+            page.html, state["visitor"], backend
+        )
+
+    def text_index() -> str:
+        state["document"]._text = None  # pylint: disable=protected-access
+        state["document"]._offsets = []  # pylint: disable=protected-access
+        return state["document"].stripped_text
+
+    def containers() -> list[str]:
+        visitor = state["visitor"]
+        state["containers"] = visitor.tank_containers(state["document"])
+        return visitor.tank_ids(state["document"], state["containers"])
+
+    def fields() -> list[dict[str, Any]]:
+        visitor = state["visitor"]
+        document = state["document"]
+        account = visitor.account_fields(document, state["containers"])
+        return [
+            visitor.tank(document, bar, container, account)
+            for bar, container in zip(visitor.progress_bars, state["containers"])
+        ]
+
+    return [
+        ("walk", build),
+        ("text_index", text_index),
+        ("tank_containers", containers),
+        ("tank_fields", fields),
+        ("total", lambda: parser.parse_tank_page(page.html, backend)),
+        (
+            "total_streamed",
+            lambda: parser.parse_tank_page(streamed(page.html), backend),
+        ),
+    ]
+
+
+def _login_stages(page: Page, backend: str) -> list[tuple[str, Callable[[], Any]]]:
+    """Return the login page stages."""
+    return [("total", lambda: parser.parse_csrf_token(page.html, backend))]
+
+
+def _delivery_stages(page: Page, backend: str) -> list[tuple[str, Callable[[], Any]]]:
+    """Return the delivery history page stages."""
+    return [("total", lambda: parser.parse_delivery_page(page.html, backend))]
+
+
+def check(page: Page, backend: str, stream: bool = False) -> str | None:
+    """Parse a page and return a description of any golden value mismatch."""
+    if page.kind == "login":
+        result: Any = parser.parse_csrf_token(page.html, backend)
+    elif page.kind == "delivery":
+        result = parser.parse_delivery_page(page.html, backend)
+    else:
+        html = streamed(page.html) if stream else page.html
+        result = parser.parse_tank_page(html, backend)
+    if result != page.expected:
+        mode = ", streamed" if stream else ""
+        return (
+            f"{page.name} [{backend}{mode}]: expected {page.expected!r}, got {result!r}"
+        )
+    return None
+
+
+def _time(stage: Callable[[], Any], iterations: int) -> float:
+    """Return the mean run time of a stage in seconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        stage()
+    return (time.perf_counter() - start) / iterations
+
+
+def _peak_memory(page: Page, backend: str, stream: bool = False) -> int:
+    """Return the peak memory allocated by a full parse in bytes."""
+    tracemalloc.start()
+    try:
+        check(page, backend, stream)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+_STAGES = {
+    "tank": _tank_stages,
+    "delivery": _delivery_stages,
+    "login": _login_stages,
+}
+
+
+def benchmark(page: Page, backend: str, iterations: int) -> list[tuple[str, float]]:
+    """Time every stage of a page and return (stage, mean seconds) pairs."""
+    stages = _STAGES[page.kind](page, backend)
+    results = []
+    for name, stage in stages:
+        if name == "walk" or name.startswith("total"):
+            results.append((name, _time(stage, iterations)))
+        else:
+            # Field stages reuse the document of the last walk
+            results.append((name, _time(stage, iterations * 10)))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark and return the process exit code."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--backend",
+        default=parser.DEFAULT_BACKEND,
+        help="parser backend to use, or 'all' for every installed backend",
+    )
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--page", action="append", help="only run these pages")
+    arg_parser.add_argument(
+        "--check-only", action="store_true", help="only check golden values"
+    )
+    arg_parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="fail if a full parse of any page takes longer than this on average",
+    )
+    args = arg_parser.parse_args(argv)
+
+    # Missing fields are expected on the login page, keep the output readable
+    logging.disable(logging.WARNING)
+
+    if args.backend == "all":
+        backends = [parser.BACKEND_HTML_PARSER]
+        if parser.resolve_backend(parser.BACKEND_AUTO) == parser.BACKEND_LXML:
+            backends.append(parser.BACKEND_LXML)
+    else:
+        backends = [parser.resolve_backend(args.backend)]
+
+    pages = [page for page in corpus() if not args.page or page.name in args.page]
+
+    failures = [
+        failure
+        for backend in backends
+        for page in pages
+        for stream in (False, True)
+        if (failure := check(page, backend, stream)) is not None
+    ]
+    for failure in failures:
+        print(f"MISMATCH {failure}")
+    if failures:
+        return 1
+    print(f"Golden values match for {len(pages)} pages on {', '.join(backends)}")
+    if args.check_only:
+        return 0
+
+    slow = []
+    print(f"{'page':<22} {'backend':<12} {'stage':<20} {'ms':>9} {'ops/s':>10}")
+    for backend in backends:
+        for page in pages:
+            for stage, seconds in benchmark(page, backend, args.iterations):
+                print(
+                    f"{page.name:<22} {backend:<12} {stage:<20} "
+                    f"{seconds * 1000:>9.3f} {1 / seconds if seconds else 0:>10.1f}"
+                )
+                if stage == "total" and args.max_ms and seconds * 1000 > args.max_ms:
+                    slow.append(f"{page.name} [{backend}]: {seconds * 1000:.1f} ms")
+            print(
+                f"{page.name:<22} {backend:<12} {'size / peak memory':<20} "
+                f"{page.size / 1024:>8.0f}K {_peak_memory(page, backend) / 1024:>9.0f}K"
+            )
+            if page.kind == "tank":
+                kept = len(streamed(page.html).encode())
+                print(
+                    f"{page.name:<22} {backend:<12} {'streamed / peak':<20} "
+                    f"{kept / 1024:>8.0f}K "
+                    f"{_peak_memory(page, backend, stream=True) / 1024:>9.0f}K"
+                )
+
+    for line in slow:
+        print(f"SLOW {line}")
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""Synthetic MyFuelPortal page corpus for the parser benchmarks.
+
+Pages mimic the markup of the portal's ``/Tank``, ``/Deliveries`` and
+``/Account/Login`` pages and come in several sizes. Every page carries the values the parser
+is expected to extract from it, so the same corpus doubles as a correctness
+gate.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+import random
+from typing import Any
+
+from . import register_client_package
+
+register_client_package()
+
+# pylint: disable=wrong-import-position
+from custom_components.myfuelportal.models import (  # noqa: E402
+    Delivery,
+    TankReading,
+    parse_date,
+)
+from custom_components.myfuelportal.parser import DeliveryPage  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+CSRF_TOKEN = "CfDJ8Nv3mQ1-benchmark-token_0123456789abcdef"
+
+_FUEL_TYPES = ("PROPANE", "HEATING", "KEROSENE", "DIESEL")
+_CAPACITIES = (100, 125, 250, 320, 500, 1000)
+
+_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{title} - MyFuelPortal</title>
+    <link href="/Content/bootstrap.min.css" rel="stylesheet" />
+    <link href="/Content/site.css" rel="stylesheet" />
+    <style>
+        .tank-row {{ margin-bottom: 20px; }}
+        .progress {{ height: 28px; }}
+    </style>
+</head>
+<body>
+    <nav class="navbar navbar-inverse navbar-fixed-top">
+        <div class="container">
+            <div class="navbar-header">
+                <a class="navbar-brand" href="/">MyFuelPortal</a>
+            </div>
+            <ul class="nav navbar-nav">
+                <li><a href="/Tank">Tanks</a></li>
+                <li><a href="/Deliveries">Deliveries</a></li>
+                <li><a href="/Payments">Payments</a></li>
+            </ul>
+            {account}
+        </div>
+    </nav>
+"""
+
+_ACCOUNT = """<ul class="nav navbar-nav navbar-right">
+                <li><span class="navbar-text">Balance Due: <b>$123.45</b></span></li>
+                <li><a href="/Account/LogOff">Log off</a></li>
+            </ul>"""
+
+_TANK = """
+        <div class="row tank-row" id="tank-{number}">
+            <div class="col-md-4">
+                <h4>Tank {number} &ndash; {address}</h4>
+                <div class="tank-info">{capacity} gal. | {fuel_type}</div>
+                <div class="progress">
+                    <div class="progress-bar progress-bar-success" role="progressbar" aria-valuenow="{level}" aria-valuemin="0" aria-valuemax="100" style="width: {level}%;">
+                        {level}%
+                    </div>
+                </div>
+                <div class="tank-gallons">Approximately {gallons} gallons in tank</div>
+            </div>
+            <div class="col-md-4">
+                <div class="tank-reading">Tank Reading: <span>{reading_date}</span></div>
+                <div class="tank-delivery">Last Delivery: <span>{delivery_date}</span></div>{price_line}
+            </div>
+        </div>"""
+
+_PRICE_LINE = """
+                <div class="tank-price">Current Price: <strong>${price:.4f} / gal</strong></div>"""
+
+# Tank cards with the reading, delivery and price in a footer of their own
+_TANK_CARD = """
+        <article class="tank-card" id="tank-{number}">
+            <h4>Tank {number} &ndash; {address}</h4>
+            <div class="tank-info">{capacity} gal. | {fuel_type}</div>
+            <div class="progress">
+                <div class="progress-bar progress-bar-success" role="progressbar" aria-valuenow="{level}" aria-valuemin="0" aria-valuemax="100" style="width: {level}%;">
+                    {level}%
+                </div>
+            </div>
+            <div class="tank-gallons">Approximately {gallons} gallons in tank</div>
+            <footer class="tank-card-footer">
+                <div class="tank-reading">Tank Reading: <span>{reading_date}</span></div>
+                <div class="tank-delivery">Last Delivery: <span>{delivery_date}</span></div>{price_line}
+            </footer>
+        </article>"""
+
+# Tanks as runs of siblings in one list, without a wrapper of their own
+_TANK_FLAT = """
+            <h4>Tank {number} &ndash; {address}</h4>
+            <div class="tank-info">{capacity} gal. | {fuel_type}</div>
+            <div class="progress">
+                <div class="progress-bar progress-bar-success" role="progressbar" aria-valuenow="{level}" aria-valuemin="0" aria-valuemax="100" style="width: {level}%;">
+                    {level}%
+                </div>
+            </div>
+            <div class="tank-gallons">Approximately {gallons} gallons in tank</div>
+            <div class="tank-reading">Tank Reading: <span>{reading_date}</span></div>
+            <div class="tank-delivery">Last Delivery: <span>{delivery_date}</span></div>{price_line}"""
+
+# A footer of the page between two sections of tanks
+_SECTION_FOOTER = """
+    </div>
+    <footer class="section-footer">
+        <p>Readings are updated daily. Last Delivery dates include all tanks.</p>
+    </footer>
+    <div class="container body-content">
+        <h2>More Tanks</h2>"""
+
+_TANK_LAYOUTS = {"rows": _TANK, "cards": _TANK_CARD, "flat": _TANK_FLAT}
+
+_FOOTER = """
+        <hr />
+        <footer>{account_price}
+            <p>&copy; 2024 - MyFuelPortal</p>
+            {links}
+        </footer>
+    </div>
+    <script src="/Scripts/jquery-3.4.1.min.js"></script>
+    <script src="/Scripts/bootstrap.min.js"></script>
+    {scripts}
+</body>
+</html>
+"""
+
+_DELIVERY_BODY = """
+    <div class="container body-content">
+        <h2>Delivery History</h2>
+        <table class="table table-striped delivery-history">
+            <thead>
+                <tr><th>Date</th><th>Invoice #</th><th>Gallons</th><th>Price / Gal</th><th>Amount</th></tr>
+            </thead>
+            <tbody>{rows}
+            </tbody>
+        </table>
+        <ul class="pagination">{pages}
+        </ul>"""
+
+_DELIVERY_ROW = """
+                <tr><td>{date}</td><td>{invoice}</td><td>{gallons:.1f}</td><td>${price:.4f}</td><td>${amount:,.2f}</td></tr>"""
+
+_LOGIN_BODY = """
+    <div class="container body-content">
+        <h2>Log in</h2>
+        <form action="/Account/Login?ReturnUrl=%2FTank" method="post" class="form-horizontal" role="form">
+            <input name="__RequestVerificationToken" type="hidden" value="{token}" />
+            <div class="form-group">
+                <label class="col-md-2 control-label" for="EmailAddress">Email</label>
+                <div class="col-md-10">
+                    <input class="form-control" id="EmailAddress" name="EmailAddress" type="email" value="" />
+                </div>
+            </div>
+            <div class="form-group">
+                <label class="col-md-2 control-label" for="Password">Password</label>
+                <div class="col-md-10">
+                    <input class="form-control" id="Password" name="Password" type="password" />
+                </div>
+            </div>
+            <div class="form-group">
+                <div class="col-md-offset-2 col-md-10">
+                    <input id="RememberMe" name="RememberMe" type="checkbox" value="true" />
+                    <label for="RememberMe">Remember me?</label>
+                </div>
+            </div>
+            <input type="submit" value="Log in" class="btn btn-default" />
+        </form>"""
+
+
+@dataclass
+class Page:
+    """A generated page and the values expected from parsing it."""
+
+    name: str
+    kind: str  # "tank", "delivery" or "login"
+    html: str
+    expected: Any = None
+    tanks: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        """Return the size of the page in bytes."""
+        return len(self.html.encode())
+
+
+def _tank(rng: random.Random, number: int) -> dict[str, Any]:
+    """Generate the values of one tank."""
+    capacity = rng.choice(_CAPACITIES)
+    level = rng.randint(5, 95)
+    return {
+        "number": number,
+        "address": f"{rng.randint(10, 9999)} County Road {rng.randint(1, 99)}",
+        "capacity": capacity,
+        "fuel_type": rng.choice(_FUEL_TYPES),
+        "level": level,
+        "gallons": round(capacity * level / 100),
+        "reading_date": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024",
+        "delivery_date": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2023",
+        "price": rng.randint(18000, 42000) / 10000,
+    }
+
+
+def _expected(tank: dict[str, Any]) -> TankReading:
+    """Return the reading expected for a tank."""
+    return TankReading(
+        tank_level_percent=float(tank["level"]),
+        gallons_remaining=float(tank["gallons"]),
+        tank_capacity=float(tank["capacity"]),
+        fuel_type=tank["fuel_type"],
+        last_delivery_date=parse_date(tank["delivery_date"]),
+        reading_date=parse_date(tank["reading_date"]),
+        current_price=float(f"{tank['price']:.4f}"),
+    )
+
+
+def _padding(rng: random.Random, padding: int) -> tuple[str, str]:
+    """Return footer links and inline scripts adding roughly padding bytes."""
+    if not padding:
+        return "", ""
+    links = "\n".join(
+        f'<a href="/Help/Article/{index}">Help article {index}: heating tips</a>'
+        for index in range(padding // 400)
+    )
+    readings = ",".join(
+        f'{{"d":"{rng.randint(1, 12)}/{rng.randint(1, 28)}/2023","v":{rng.random():.6f}}}'
+        for _ in range(padding // 80)
+    )
+    scripts = (
+        f"<script>window.__history = [{readings}];</script>\n"
+        "<script>// Last delivery and $ prices below are chart labels, not data\n"
+        "var labels = ['Last Delivery', '$0.00 / gal'];</script>"
+    )
+    return links, scripts
+
+
+def tank_page(
+    name: str,
+    tanks: int = 1,
+    padding: int = 0,
+    seed: int = 1,
+    layout: str = "rows",
+    price_in_footer: bool = False,
+    footer_after: int = 0,
+) -> Page:
+    """Generate a Tank page with the given number of tanks and padding.
+
+    Tanks are laid out as rows, as cards with a footer of their own, or
+    flat as runs of siblings in one list. With price_in_footer the price is
+    only shown once, in the page footer, and applies to every tank. With
+    footer_after a footer of the page follows that many tanks, and the
+    other tanks come after it.
+    """
+    rng = random.Random(seed)
+    values = [_tank(rng, number) for number in range(1, tanks + 1)]
+    links, scripts = _padding(rng, padding)
+    account_price = ""
+    if price_in_footer:
+        for tank in values:
+            tank["price"] = values[0]["price"]
+        account_price = "\n            <p>" + _PRICE_LINE.format(**values[0]).strip() + "</p>"
+    template = _TANK_LAYOUTS[layout]
+    price_line = "" if price_in_footer else _PRICE_LINE
+    rendered = [
+        template.format(price_line=price_line.format(**tank), **tank)
+        for tank in values
+    ]
+    if footer_after:
+        rendered.insert(footer_after, _SECTION_FOOTER)
+    tanks_html = "".join(rendered)
+    if layout == "flat":
+        tanks_html = f'\n        <div class="tank-list">{tanks_html}\n        </div>'
+    html = (
+        _HEAD.format(title="Tank", account=_ACCOUNT)
+        + '    <div class="container body-content">\n        <h2>My Tanks</h2>'
+        + tanks_html
+        + _FOOTER.format(links=links, scripts=scripts, account_price=account_price)
+    )
+    # Tanks are identified by the id of their row, or numbered in page order
+    # when they have none
+    expected = {
+        str(tank["number"]) if layout == "flat" else f"tank-{tank['number']}": (
+            _expected(tank)
+        )
+        for tank in values
+    }
+    return Page(name, "tank", html, expected, values)
+
+
+def _deliveries(count: int, seed: int) -> list[dict[str, Any]]:
+    """Generate the values of a delivery history, newest first."""
+    rng = random.Random(seed)
+    day = date(2024, 12, 15)
+    values = []
+    for number in range(count, 0, -1):
+        gallons = rng.randint(800, 3000) / 10
+        price = rng.randint(18000, 42000) / 10000
+        values.append(
+            {
+                "date": day.strftime("%m/%d/%Y"),
+                "invoice": f"INV-{100000 + number}",
+                "gallons": gallons,
+                "price": price,
+                "amount": round(gallons * price, 2),
+            }
+        )
+        day -= timedelta(days=rng.randint(30, 60))
+    return values
+
+
+def delivery_page(
+    name: str, page: int = 1, deliveries: int = 25, per_page: int = 10, seed: int = 1
+) -> Page:
+    """Generate one page of a delivery history, newest deliveries first."""
+    values = _deliveries(deliveries, seed)
+    last_page = max(1, -(-deliveries // per_page))
+    rows = values[(page - 1) * per_page : page * per_page]
+    html = (
+        _HEAD.format(title="Deliveries", account=_ACCOUNT)
+        + _DELIVERY_BODY.format(
+            rows="".join(_DELIVERY_ROW.format(**row) for row in rows),
+            pages="".join(
+                f'\n            <li><a href="/Deliveries?page={number}">{number}</a></li>'
+                for number in range(1, last_page + 1)
+            ),
+        )
+        + _FOOTER.format(links="", scripts="", account_price="")
+    )
+    expected = DeliveryPage(
+        [
+            Delivery(
+                parse_date(row["date"]),
+                row["gallons"],
+                row["price"],
+                row["amount"],
+                row["invoice"],
+            )
+            for row in rows
+        ],
+        last_page,
+    )
+    return Page(name, "delivery", html, expected)
+
+
+def login_page(name: str, padding: int = 0, seed: int = 1) -> Page:
+    """Generate a login page with the CSRF token input."""
+    links, scripts = _padding(random.Random(seed), padding)
+    html = (
+        _HEAD.format(title="Log in", account="")
+        + _LOGIN_BODY.format(token=CSRF_TOKEN)
+        + _FOOTER.format(links=links, scripts=scripts, account_price="")
+    )
+    return Page(name, "login", html, CSRF_TOKEN)
+
+
+def corpus() -> list[Page]:
+    """Return the benchmark corpus, smallest pages first."""
+    return [
+        login_page("login"),
+        login_page("login-padded", padding=200_000),
+        tank_page("tank-single"),
+        tank_page("tank-multi-10", tanks=10),
+        tank_page("tank-multi-50", tanks=50),
+        tank_page("tank-padded", padding=500_000),
+        tank_page("tank-multi-50-padded", tanks=50, padding=500_000),
+        tank_page("tank-cards-3", tanks=3, layout="cards", padding=50_000),
+        tank_page("tank-footer-price", price_in_footer=True),
+        tank_page("tank-multi-3-footer-price", tanks=3, price_in_footer=True),
+        tank_page("tank-flat-3", tanks=3, layout="flat"),
+        tank_page("tank-footer-between", tanks=3, footer_after=1),
+        delivery_page("deliveries"),
+        delivery_page("deliveries-last", page=3),
+    ]
@@ -0,0 +1,379 @@
+"""Load test of the MyFuelPortal client against the mock portal.
+
+Run from the repository root:
+
+    python -m benchmarks.load_test --clients 300 --rounds 3
+    python -m benchmarks.load_test --clients 300 --latency 0.05 --error-rate 0.02 --retry-after 1
+    python -m benchmarks.load_test --mode coordinator --clients 200
+
+Every client logs in to a local mock portal, then refreshes its tank data a
+number of rounds, logging in again when its session expired, like the
+coordinator does. In ``coordinator`` mode real coordinators sharing one
+fleet scheduler are refreshed instead, which needs Home Assistant to be
+installed; the default ``api`` mode only uses the API client and runs
+without it. All clients share one rate limiter and circuit breaker, as the
+clients of one portal host do in Home Assistant.
+
+The report gives the throughput and latency percentiles of the logins and
+refreshes, their outcomes, the requests the portal served and the counters
+of the clients.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, nullcontext
+from dataclasses import dataclass, field
+import json
+import logging
+import math
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from . import register_client_package
+
+register_client_package()
+
+# pylint: disable=wrong-import-position
+import aiohttp  # noqa: E402
+
+from custom_components.myfuelportal.api import (  # noqa: E402
+    AuthenticationError,
+    MyFuelPortalAPI,
+    MyFuelPortalAPIError,
+    create_connector,
+)
+from custom_components.myfuelportal.throttle import HostGuard  # noqa: E402
+
+from . import mock_portal  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+MODE_API = "api"
+MODE_COORDINATOR = "coordinator"
+
+
+@dataclass
+class Phase:
+    """Durations and outcomes of one kind of operation."""
+
+    durations: list[float] = field(default_factory=list)
+    outcomes: Counter[str] = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    async def async_run(self, operation: Callable[[], Awaitable[Any]]) -> None:
+        """Run and time an operation, counting how it ended."""
+        start = time.perf_counter()
+        try:
+            await operation()
+        except MyFuelPortalAPIError as err:
+            self.outcomes[type(err).__name__] += 1
+        else:
+            self.outcomes["ok"] += 1
+        self.durations.append(time.perf_counter() - start)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the throughput, percentiles and outcomes."""
+        durations = sorted(self.durations)
+        summary: dict[str, Any] = {
+            "count": len(durations),
+            "elapsed_s": round(self.elapsed, 3),
+            "per_second": round(len(durations) / self.elapsed, 1) if self.elapsed else None,
+            "outcomes": dict(self.outcomes.most_common()),
+        }
+        for percentile in (50, 90, 99, 100):
+            summary[f"p{percentile}_ms"] = (
+                round(_percentile(durations, percentile) * 1000, 2) if durations else None
+            )
+        return summary
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    """Return the nearest rank percentile of sorted values."""
+    return values[max(1, math.ceil(percentile / 100 * len(values))) - 1]
+
+
+async def _async_refresh(api: MyFuelPortalAPI) -> None:
+    """Fetch tank data, logging in again once if the session expired."""
+    try:
+        await api.async_get_tank_data()
+    except AuthenticationError:
+        await api.async_login()
+        await api.async_get_tank_data()
+
+
+async def _async_run_clients(
+    args: argparse.Namespace,
+    clients: list[MyFuelPortalAPI],
+    setup: Phase,
+    refresh: Phase,
+) -> None:
+    """Log every client in, then refresh them for the given rounds."""
+    limit: AbstractAsyncContextManager[Any] = (
+        asyncio.Semaphore(args.concurrency) if args.concurrency else nullcontext()
+    )
+    rng = random.Random(args.seed)
+
+    async def _async_limited(operation: Callable[[], Awaitable[Any]]) -> None:
+        async with limit:
+            await operation()
+
+    async def _async_client(api: MyFuelPortalAPI, delays: list[float]) -> None:
+        for delay in delays:
+            await asyncio.sleep(delay)
+            await refresh.async_run(lambda: _async_limited(lambda: _async_refresh(api)))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(setup.async_run(lambda api=api: _async_limited(api.async_login)) for api in clients)
+    )
+    setup.elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _async_client(
+                api,
+                [
+                    rng.uniform(0.5, 1.5) * args.interval if index else 0.0
+                    for index in range(args.rounds)
+                ],
+            )
+            for api in clients
+        )
+    )
+    refresh.elapsed = time.perf_counter() - start
+
+
+async def _async_run_coordinators(
+    args: argparse.Namespace,
+    clients: list[MyFuelPortalAPI],
+    setup: Phase,
+    refresh: Phase,
+) -> None:
+    """Log every client in, then refresh real coordinators for the given rounds."""
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.core import HomeAssistant
+
+    # pylint: disable-next=import-outside-toplevel
+    from custom_components.myfuelportal.coordinator import MyCoordinator
+
+    # pylint: disable-next=import-outside-toplevel
+    from custom_components.myfuelportal.scheduler import FleetScheduler
+
+    start = time.perf_counter()
+    await asyncio.gather(*(setup.async_run(api.async_login) for api in clients))
+    setup.elapsed = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        fleet = FleetScheduler(args.concurrency or len(clients))
+        coordinators = [
+            MyCoordinator(
+                hass,
+                # The coordinator only reads the ID, title and options of its
+                # entry, and starts the delivery sync as a background task
+                SimpleNamespace(  # type: ignore[arg-type]
+                    entry_id=f"load_test_{index}",
+                    title=f"Load test {index}",
+                    options={},
+                    async_create_background_task=(
+                        lambda hass, target, name: hass.async_create_background_task(
+                            target, name
+                        )
+                    ),
+                ),
+                api,
+                fleet,
+            )
+            for index, api in enumerate(clients)
+        ]
+
+        async def _async_coordinator_refresh(coordinator: MyCoordinator) -> None:
+            await coordinator.async_refresh()
+            if not coordinator.last_update_success:
+                refresh.outcomes[type(coordinator.last_exception).__name__] += 1
+                refresh.outcomes["ok"] -= 1
+
+        start = time.perf_counter()
+        for index in range(args.rounds):
+            if index and args.interval:
+                await asyncio.sleep(args.interval)
+            await asyncio.gather(
+                *(
+                    refresh.async_run(
+                        lambda coordinator=coordinator: _async_coordinator_refresh(
+                            coordinator
+                        )
+                    )
+                    for coordinator in coordinators
+                )
+            )
+        refresh.elapsed = time.perf_counter() - start
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+
+async def async_load_test(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test and return its report."""
+    portal = mock_portal.MockPortal(mock_portal.config_from_args(args))
+    url = await portal.async_start()
+    guard = HostGuard(
+        rate=args.rate,
+        burst=args.burst,
+        failure_threshold=args.failure_threshold,
+        base_backoff=args.base_backoff,
+        max_backoff=args.max_backoff,
+    )
+    connector: aiohttp.BaseConnector | None = (
+        create_connector(limit_per_host=args.connections)
+        if args.shared_connector
+        else None
+    )
+    clients = [
+        MyFuelPortalAPI(
+            f"user{index}@example.com",
+            mock_portal.PASSWORD,
+            base_url=url,
+            parse_in_executor=not args.parse_inline,
+            connector=connector,
+            guard=guard,
+            streaming=not args.no_streaming,
+        )
+        for index in range(args.clients)
+    ]
+    setup = Phase()
+    refresh = Phase()
+    try:
+        if args.mode == MODE_COORDINATOR:
+            await _async_run_coordinators(args, clients, setup, refresh)
+        else:
+            await _async_run_clients(args, clients, setup, refresh)
+    finally:
+        for api in clients:
+            await api.async_close()
+        if connector is not None:
+            await connector.close()
+        await portal.async_stop()
+
+    counters: Counter[str] = Counter()
+    for api in clients:
+        counters.update(api.metrics.counters)
+    return {
+        "mode": args.mode,
+        "clients": args.clients,
+        "rounds": args.rounds,
+        "shared_connector": args.shared_connector,
+        "streaming": not args.no_streaming,
+        "login": setup.as_dict(),
+        "refresh": refresh.as_dict(),
+        "portal": {
+            "requests": dict(sorted(portal.requests.items())),
+            "logins": portal.logins,
+            "bytes_sent": portal.bytes_sent,
+        },
+        "client_counters": dict(sorted(counters.items())),
+        "guard": guard.as_dict(),
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    """Print the report as tables."""
+    print(
+        f"{report['clients']} clients x {report['rounds']} rounds, mode {report['mode']}, "
+        f"{'shared' if report['shared_connector'] else 'own'} connectors, "
+        f"{'streamed' if report['streaming'] else 'whole'} pages"
+    )
+    print(
+        f"{'':<10}{'count':>8}{'s':>9}{'ops/s':>9}"
+        f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}  outcomes"
+    )
+    for name in ("login", "refresh"):
+        phase = report[name]
+        latencies = "".join(
+            f"{phase[key] if phase[key] is not None else '-':>10}"
+            for key in ("p50_ms", "p90_ms", "p99_ms", "p100_ms")
+        )
+        outcomes = ", ".join(f"{outcome} {count}" for outcome, count in phase["outcomes"].items())
+        print(
+            f"{name:<10}{phase['count']:>8}{phase['elapsed_s']:>9}"
+            f"{phase['per_second'] or '-':>9}{latencies}  {outcomes}"
+        )
+    print("\nportal requests")
+    for route, count in report["portal"]["requests"].items():
+        print(f"  {route:<22}{count:>8}")
+    print(f"  {'logins':<22}{report['portal']['logins']:>8}")
+    print(f"  {'bytes sent':<22}{report['portal']['bytes_sent']:>8}")
+    print("\nclient counters")
+    for counter, value in report["client_counters"].items():
+        print(f"  {counter:<34}{value:>10}")
+    print(f"\nguard {report['guard']}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=(MODE_API, MODE_COORDINATOR), default=MODE_API)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3, help="refreshes per client")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.0,
+        help="mean seconds between the refreshes of a client",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        help="refreshes running at once, or fleet slots in coordinator mode; 0 is unlimited",
+    )
+    parser.add_argument(
+        "--own-connectors",
+        dest="shared_connector",
+        action="store_false",
+        help="give every client its own connection pool",
+    )
+    parser.add_argument(
+        "--connections", type=int, default=10, help="connections of the shared pool"
+    )
+    parser.add_argument("--no-streaming", action="store_true", help="read whole pages")
+    parser.add_argument(
+        "--parse-inline", action="store_true", help="parse on the event loop"
+    )
+    group = parser.add_argument_group("rate limiter and circuit breaker")
+    group.add_argument("--rate", type=float, default=200.0, help="requests per second")
+    group.add_argument("--burst", type=int, default=50)
+    group.add_argument("--failure-threshold", type=int, default=5)
+    group.add_argument("--base-backoff", type=float, default=1.0, help="seconds")
+    group.add_argument("--max-backoff", type=float, default=30.0, help="seconds")
+    mock_portal.add_arguments(parser)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    if args.mode == MODE_COORDINATOR:
+        try:
+            # pylint: disable-next=import-outside-toplevel,unused-import
+            import homeassistant  # noqa: F401
+        except ImportError:
+            parser.error("coordinator mode needs Home Assistant to be installed")
+
+    # Breaker and parse warnings of hundreds of clients would drown the report
+    logging.basicConfig(level=logging.ERROR)
+
+    report = asyncio.run(async_load_test(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
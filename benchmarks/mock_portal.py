@@ -0,0 +1,294 @@
+"""Local stand-in for the MyFuelPortal web portal.
+
+Serves the login flow, the Tank page and the delivery history of the
+synthetic corpus, with configurable latency, error rate, session lifetime
+and page size, so client and scheduling changes can be measured without
+touching the real portal.
+
+Run from the repository root:
+
+    python -m benchmarks.mock_portal --port 8080 --latency 0.05 --error-rate 0.01
+
+Any email logs in with the password ``password``. The login page hands out a
+CSRF token tied to an anti-forgery cookie, a successful login sets a session
+cookie and redirects to ``/Tank``, and expired or missing sessions are
+redirected back to the login page, like the portal does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import hashlib
+import logging
+import random
+import secrets
+import time
+
+from aiohttp import web
+
+# The corpus makes the integration importable without Home Assistant
+from .corpus import CSRF_TOKEN, delivery_page, login_page, tank_page
+
+_LOGGER = logging.getLogger(__name__)
+
+PASSWORD = "password"
+SESSION_COOKIE = ".AspNet.ApplicationCookie"
+ANTIFORGERY_COOKIE = "__RequestVerificationToken"
+
+
+@dataclass
+class PortalConfig:
+    """Behaviour of the mock portal."""
+
+    # Mean response delay and its standard deviation, in seconds
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    # Share of requests answered with 503, and the Retry-After sent with them
+    error_rate: float = 0.0
+    retry_after: int | None = None
+    # Seconds a login stays valid
+    session_ttl: float = 3600.0
+    # Tanks on the Tank page, and bytes of footer padding after them
+    tanks: int = 1
+    padding: int = 0
+    # Deliveries in the delivery history, and deliveries per history page
+    deliveries: int = 25
+    deliveries_per_page: int = 10
+    # Send an ETag with the Tank page and answer 304 when it matches
+    etag: bool = False
+    # Charset declared in the Content-Type of pages, if any
+    charset: str | None = "utf-8"
+    seed: int = 1
+
+
+class MockPortal:
+    """An aiohttp application behaving like the portal."""
+
+    def __init__(self, config: PortalConfig | None = None) -> None:
+        """Initialize the portal and render its pages."""
+        self.config = config or PortalConfig()
+        self._rng = random.Random(self.config.seed)
+        self._login_html = login_page("login", seed=self.config.seed).html
+        self._tank_html = tank_page(
+            "tank",
+            tanks=self.config.tanks,
+            padding=self.config.padding,
+            seed=self.config.seed,
+        ).html
+        self._tank_etag = (
+            f'"{hashlib.blake2b(self._tank_html.encode(), digest_size=8).hexdigest()}"'
+        )
+        # Delivery history pages by number, rendered on first request
+        self._delivery_html: dict[int, str] = {}
+        # Session cookie values and when they expire
+        self._sessions: dict[str, float] = {}
+        # Requests by route and status, and response bytes sent
+        self.requests: Counter[str] = Counter()
+        self.bytes_sent = 0
+        self.logins = 0
+        self._runner: web.AppRunner | None = None
+
+    def app(self) -> web.Application:
+        """Return the application serving the portal routes."""
+        app = web.Application()
+        app.router.add_get("/Account/Login", self._login_page)
+        app.router.add_post("/Account/Login", self._login)
+        app.router.add_get("/Tank", self._tank)
+        app.router.add_get("/Deliveries", self._deliveries)
+        return app
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        # aiohttp's cookie jar ignores cookies of IP address hosts
+        if host in ("127.0.0.1", "0.0.0.0"):
+            host = "localhost"
+        return f"http://{host}:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _count(self, route: str, response: web.StreamResponse) -> web.StreamResponse:
+        """Count a response by route and status."""
+        self.requests[f"{route} {response.status}"] += 1
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_sent += len(response.body)
+        return response
+
+    async def _delay(self) -> web.Response | None:
+        """Wait the configured latency, and return an error response if drawn."""
+        config = self.config
+        if config.latency:
+            await asyncio.sleep(
+                max(0.0, self._rng.gauss(config.latency, config.latency_jitter))
+            )
+        if config.error_rate and self._rng.random() < config.error_rate:
+            headers = {}
+            if config.retry_after is not None:
+                headers["Retry-After"] = str(config.retry_after)
+            return web.Response(status=503, text="Service Unavailable", headers=headers)
+        return None
+
+    def _logged_in(self, request: web.Request) -> bool:
+        """Return True if the request carries a session that has not expired."""
+        expires = self._sessions.get(request.cookies.get(SESSION_COOKIE, ""))
+        return expires is not None and expires > time.monotonic()
+
+    async def _login_page(self, request: web.Request) -> web.StreamResponse:
+        """Serve the login form with a fresh CSRF token."""
+        if (error := await self._delay()) is not None:
+            return self._count("login_get", error)
+        token = secrets.token_urlsafe(24)
+        response = self._page(self._login_html.replace(CSRF_TOKEN, token))
+        response.set_cookie(ANTIFORGERY_COOKIE, token, httponly=True)
+        return self._count("login_get", response)
+
+    async def _login(self, request: web.Request) -> web.StreamResponse:
+        """Check the credentials and token, and start a session."""
+        if (error := await self._delay()) is not None:
+            return self._count("login_post", error)
+        form = await request.post()
+        token = request.cookies.get(ANTIFORGERY_COOKIE)
+        if (
+            not token
+            or form.get("__RequestVerificationToken") != token
+            or form.get("Password") != PASSWORD
+        ):
+            # The portal shows the form again
+            response = self._page(self._login_html)
+            return self._count("login_post", response)
+
+        session = secrets.token_urlsafe(32)
+        self._sessions[session] = time.monotonic() + self.config.session_ttl
+        self.logins += 1
+        response = _redirect(request.query.get("ReturnUrl", "/Tank"))
+        response.set_cookie(SESSION_COOKIE, session, httponly=True)
+        return self._count("login_post", response)
+
+    async def _tank(self, request: web.Request) -> web.StreamResponse:
+        """Serve the Tank page to logged in sessions."""
+        if (error := await self._delay()) is not None:
+            return self._count("tank", error)
+        if not self._logged_in(request):
+            return self._count("tank", _redirect("/Account/Login?ReturnUrl=%2FTank"))
+        if self.config.etag:
+            if request.headers.get("If-None-Match") == self._tank_etag:
+                return self._count("tank", web.Response(status=304))
+            response = self._page(self._tank_html, {"ETag": self._tank_etag})
+        else:
+            response = self._page(self._tank_html)
+        return self._count("tank", response)
+
+    async def _deliveries(self, request: web.Request) -> web.StreamResponse:
+        """Serve a page of the delivery history to logged in sessions."""
+        if (error := await self._delay()) is not None:
+            return self._count("deliveries", error)
+        if not self._logged_in(request):
+            return self._count(
+                "deliveries", _redirect("/Account/Login?ReturnUrl=%2FDeliveries")
+            )
+        try:
+            page = max(1, int(request.query.get("page", "1")))
+        except ValueError:
+            page = 1
+        if (html := self._delivery_html.get(page)) is None:
+            html = self._delivery_html[page] = delivery_page(
+                "deliveries",
+                page=page,
+                deliveries=self.config.deliveries,
+                per_page=self.config.deliveries_per_page,
+                seed=self.config.seed,
+            ).html
+        return self._count("deliveries", self._page(html))
+
+    def _page(self, html: str, headers: dict[str, str] | None = None) -> web.Response:
+        """Return an HTML page, declaring the configured charset if any."""
+        charset = self.config.charset
+        content_type = "text/html" if charset is None else f"text/html; charset={charset}"
+        return web.Response(
+            body=html.encode(charset or "utf-8"),
+            headers={"Content-Type": content_type, **(headers or {})},
+        )
+
+
+def _redirect(location: str) -> web.Response:
+    """Return a 302 redirect."""
+    return web.Response(status=302, headers={"Location": location})
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the portal behaviour options to a command line parser."""
+    group = parser.add_argument_group("mock portal")
+    group.add_argument("--latency", type=float, default=0.0, help="mean response delay in seconds")
+    group.add_argument("--latency-jitter", type=float, default=0.0, help="standard deviation of the delay")
+    group.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    group.add_argument("--retry-after", type=int, default=None, help="Retry-After seconds sent with 503s")
+    group.add_argument("--session-ttl", type=float, default=3600.0, help="seconds a login stays valid")
+    group.add_argument("--tanks", type=int, default=1, help="tanks on the Tank page")
+    group.add_argument("--padding", type=int, default=0, help="bytes of padding after the tanks")
+    group.add_argument(
+        "--deliveries", type=int, default=25, help="deliveries in the delivery history"
+    )
+    group.add_argument("--etag", action="store_true", help="send ETags and answer 304")
+    group.add_argument(
+        "--no-charset", action="store_true", help="send pages without a declared charset"
+    )
+    group.add_argument("--seed", type=int, default=1, help="seed of the page values and error draws")
+
+
+def config_from_args(args: argparse.Namespace) -> PortalConfig:
+    """Return the portal configuration given on the command line."""
+    return PortalConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        session_ttl=args.session_ttl,
+        tanks=args.tanks,
+        padding=args.padding,
+        deliveries=args.deliveries,
+        etag=args.etag,
+        charset=None if args.no_charset else "utf-8",
+        seed=args.seed,
+    )
+
+
+async def _async_serve(portal: MockPortal, host: str, port: int) -> None:
+    """Serve until interrupted."""
+    url = await portal.async_start(host, port)
+    print(f"Mock portal listening on {url}, password is {PASSWORD!r}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await portal.async_stop()
+        for route, count in sorted(portal.requests.items()):
+            print(f"{route:<20}{count:>8}")
+
+
+def main() -> int:
+    """Run the mock portal until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_async_serve(MockPortal(config_from_args(args)), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
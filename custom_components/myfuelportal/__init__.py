@@ -5,14 +5,42 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import MyFuelPortalAPI
-from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
-from .coordinator import MyCoordinator
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    DATA_VALIDATED_CLIENTS,
+    DOMAIN,
+    SERVICE_IMPORT_STATISTICS,
+    SERVICE_PROFILE_REFRESH,
+)
+from .coordinator import (
+    MyCoordinator,
+    deliveries_store,
+    history_path,
+    schedule_store,
+    session_store,
+    snapshot_store,
+)
+from .history import ReadingHistory
+from .profiling import async_profile_refresh
+from .scheduler import async_get_fleet_scheduler
+from .statistics import async_import_statistics
 
 if TYPE_CHECKING:
     from homeassistant.helpers.typing import ConfigType
@@ -24,36 +52,139 @@ PLATFORMS: list[Platform] = [
     Platform.SENSOR,
 ]
 
+# Services act on one account, or on every account when none is given
+SERVICE_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the MyFuelPortal component."""
     # Initialize the integration's data storage
     hass.data.setdefault(DOMAIN, {})
+
+    async def _async_import_statistics(call: ServiceCall) -> ServiceResponse:
+        """Import the history of one or all accounts into long-term statistics."""
+        imported = {}
+        for entry_id, coordinator in _service_coordinators(hass, call).items():
+            # Deliveries come from the synced delivery history; backfill it
+            # first if it was never synced, even while polls back off after
+            # a failed sync
+            if coordinator.data:
+                await coordinator.async_sync_deliveries(
+                    coordinator.data, False, ignore_backoff=True
+                )
+            imported[entry_id] = await async_import_statistics(hass, coordinator)
+        return {"imported": imported}
+
+    async def _async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+        """Refresh one or all accounts under the profiler and save reports."""
+        reports = {}
+        for entry_id, coordinator in _service_coordinators(hass, call).items():
+            reports[entry_id] = await async_profile_refresh(hass, coordinator)
+        return {"reports": reports}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_STATISTICS,
+        _async_import_statistics,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _async_profile_refresh,
+        schema=SERVICE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     return True
 
 
+def _service_coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, MyCoordinator]:
+    """Return the coordinators a service call acts on, keyed by entry ID."""
+    coordinators = {
+        entry_id: coordinator
+        for entry_id, coordinator in hass.data[DOMAIN].items()
+        if isinstance(coordinator, MyCoordinator)
+    }
+    if entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID):
+        if entry_id not in coordinators:
+            raise ServiceValidationError(
+                f"No loaded MyFuelPortal entry with ID {entry_id}"
+            )
+        coordinators = {entry_id: coordinators[entry_id]}
+    return coordinators
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MyFuelPortal from a config entry."""
     _LOGGER.debug("Setting up %s integration", DOMAIN)
 
-    # Initialize the API client
-    api = MyFuelPortalAPI(
-        entry.data[CONF_EMAIL],
-        entry.data[CONF_PASSWORD],
-    )
+    # Take over the client the config flow just logged in with, if any; from
+    # here on setup closes it when it fails
+    validated = hass.data.setdefault(DOMAIN, {}).get(DATA_VALIDATED_CLIENTS, {})
+    api: MyFuelPortalAPI | None = validated.pop(entry.unique_id, None)
+    if not validated:
+        hass.data[DOMAIN].pop(DATA_VALIDATED_CLIENTS, None)
+    logged_in = api is not None
+
+    # Initialize the API client. Each account gets its own session and cookie
+    # jar, on top of Home Assistant's shared pool of connections; the client
+    # owns the session and closes it on unload or when setup fails
+    if api is None:
+        api = MyFuelPortalAPI(
+            entry.data[CONF_EMAIL],
+            entry.data[CONF_PASSWORD],
+            session=async_create_clientsession(hass, auto_cleanup=False),
+            owns_session=True,
+        )
 
-    # Authenticate with the API
     try:
-        await api.async_login()
-    except Exception as err:
+        await _async_setup_coordinator(hass, entry, api, logged_in)
+    except BaseException:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
         await api.async_close()
-        raise ConfigEntryNotReady(f"Failed to authenticate: {err}") from err
+        raise
+
+    # Reload the entry when the polling options change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
+    return True
 
-    # Create the data update coordinator
-    coordinator = MyCoordinator(hass, entry, api)
 
-    # Fetch initial data to verify the connection works
-    await coordinator.async_config_entry_first_refresh()
+async def _async_setup_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, api: MyFuelPortalAPI, logged_in: bool
+) -> None:
+    """Create the coordinator of an entry and set up its platforms."""
+    # Create the data update coordinator; its portal requests are paced by
+    # the scheduler shared with the other accounts
+    fleet = async_get_fleet_scheduler(hass)
+    coordinator = MyCoordinator(hass, entry, api, fleet)
+
+    if await coordinator.async_restore_snapshot():
+        # Entities start with the data of the previous run; the portal is
+        # polled in the background, logging in again if the saved login
+        # expired
+        if not logged_in:
+            await coordinator.async_restore_session()
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} {entry.entry_id} refresh"
+        )
+    else:
+        # Reuse the login of the previous run when its cookies were saved; if
+        # the portal expired it, the first refresh logs in again
+        if not logged_in and not await coordinator.async_restore_session():
+            try:
+                async with fleet.slot(None):
+                    await api.async_login()
+            except Exception as err:
+                raise ConfigEntryNotReady(f"Failed to authenticate: {err}") from err
+
+        # Fetch initial data to verify the connection works. Right after a
+        # login this parses the Tank page the login landed on, without another
+        # request
+        await coordinator.async_config_entry_first_refresh()
 
     # Store the coordinator in hass.data for access by platforms
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -61,8 +192,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Set up all platforms for this integration
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    return True
-
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
@@ -77,3 +206,19 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         await coordinator.api.async_close()
 
     return unload_ok
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored data of a deleted config entry."""
+    await session_store(hass, entry.entry_id).async_remove()
+    await schedule_store(hass, entry.entry_id).async_remove()
+    await snapshot_store(hass, entry.entry_id).async_remove()
+    await deliveries_store(hass, entry.entry_id).async_remove()
+    await hass.async_add_executor_job(
+        ReadingHistory(history_path(hass, entry.entry_id)).remove
+    )
@@ -2,37 +2,142 @@
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from http.cookies import Morsel
 import logging
-import re
-from typing import Any
+import time
+from typing import Any, TypeVar
 
 import aiohttp
-from bs4 import BeautifulSoup
+from yarl import URL
+
+from .exceptions import (  # noqa: F401  # re-exported for callers of the API
+    AuthenticationError,
+    CircuitOpenError,
+    ConnectionError,
+    MyFuelPortalAPIError,
+    ParsingError,
+)
+from .metrics import (
+    COUNTER_BYTES_RECEIVED,
+    COUNTER_LOGINS,
+    COUNTER_NOT_MODIFIED,
+    COUNTER_PARSE_FALLBACKS,
+    COUNTER_UNCHANGED_PAGES,
+    PHASE_CSRF_PARSE,
+    PHASE_DELIVERY_FETCH,
+    PHASE_DELIVERY_PARSE,
+    PHASE_LOGIN_GET,
+    PHASE_LOGIN_POST,
+    PHASE_TANK_FETCH,
+    PHASE_TANK_PARSE,
+    RefreshMetrics,
+)
+from .models import TankReading
+from .parser import (
+    DeliveryPage,
+    ParseStats,
+    TankPageReader,
+    page_fingerprint,
+    parse_csrf_token,
+    parse_delivery_page,
+    parse_tank_page,
+)
+from .throttle import HostGuard, host_guard
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
-class MyFuelPortalAPIError(Exception):
-    """Base exception for MyFuelPortal API errors."""
+# A login this recent is reused instead of logging in again
+RECENT_LOGIN_SECONDS = 30
 
+# Largest Tank page accepted, and the size of the chunks it is read in
+MAX_PAGE_SIZE = 4 * 1024 * 1024  # bytes
+_CHUNK_SIZE = 16 * 1024  # bytes
 
-class AuthenticationError(MyFuelPortalAPIError):
-    """Authentication failed."""
+# How often the event loop is probed for lag while a page is parsed
+_LAG_PROBE_INTERVAL = 0.005  # seconds
 
 
-class ConnectionError(MyFuelPortalAPIError):
-    """Connection to MyFuelPortal failed."""
+def create_connector(limit_per_host: int = 10) -> aiohttp.TCPConnector:
+    """Create a connector with pooled keep-alive connections.
 
+    A connector can be shared by the clients of many accounts on the same
+    portal host, so they reuse warm TCP/TLS connections and cached DNS
+    lookups instead of each opening their own. Responses are still
+    negotiated with gzip/deflate compression by aiohttp.
+    """
+    return aiohttp.TCPConnector(
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
 
-class ParsingError(MyFuelPortalAPIError):
-    """Failed to parse data from HTML."""
+
+def _incremental_decoder(charset: str | None) -> codecs.IncrementalDecoder:
+    """Return a decoder for a streamed body in the declared charset.
+
+    aiohttp can only guess the charset of a body it has read whole, so a
+    body without a declared charset, or with an unknown one, is decoded as
+    UTF-8, replacing invalid bytes.
+    """
+    try:
+        factory = codecs.getincrementaldecoder(charset or "utf-8")
+    except LookupError:
+        _LOGGER.debug("Unknown charset %s, decoding the Tank page as UTF-8", charset)
+        factory = codecs.getincrementaldecoder("utf-8")
+    return factory(errors="replace")
+
+
+class _LoopLagProbe:
+    """Measure how late the event loop runs callbacks, until stopped.
+
+    A callback is scheduled every few milliseconds and the time it runs
+    after its due time is added up, so the total is the time the loop
+    could not run anything, whatever held it up.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start probing a running loop."""
+        self.lag = 0.0
+        self._loop = loop
+        self._due = loop.time() + _LAG_PROBE_INTERVAL
+        self._handle = loop.call_at(self._due, self._probe)
+
+    def _probe(self) -> None:
+        """Add the lateness of this call and schedule the next one."""
+        now = self._loop.time()
+        self.lag += max(now - self._due, 0.0)
+        self._due = now + _LAG_PROBE_INTERVAL
+        self._handle = self._loop.call_at(self._due, self._probe)
+
+    def stop(self) -> float:
+        """Stop probing and return the total lag."""
+        self._handle.cancel()
+        self.lag += max(self._loop.time() - self._due, 0.0)
+        return self.lag
 
 
 class MyFuelPortalAPI:
     """API client for MyFuelPortal."""
 
     def __init__(
-        self, email: str, password: str, base_url: str = "https://kbjohnson.myfuelportal.com"
+        self,
+        email: str,
+        password: str,
+        base_url: str = "https://kbjohnson.myfuelportal.com",
+        parser_backend: str | None = None,
+        parse_in_executor: bool = True,
+        session: aiohttp.ClientSession | None = None,
+        owns_session: bool = False,
+        connector: aiohttp.BaseConnector | None = None,
+        guard: HostGuard | None = None,
+        streaming: bool = True,
+        max_page_size: int = MAX_PAGE_SIZE,
     ) -> None:
         """Initialize the API client.
 
@@ -40,22 +145,202 @@ class MyFuelPortalAPI:
             email: User's email address for authentication
             password: User's password
             base_url: Base URL for the MyFuelPortal instance
+            parser_backend: HTML parser backend, see parser.resolve_backend
+            parse_in_executor: Parse pages on a worker thread instead of
+                blocking the event loop
+            session: Session to use instead of creating one. It must have its
+                own cookie jar, and is left open by async_close
+            owns_session: Close the given session in async_close, for callers
+                that hand the session over to the client
+            connector: Connector shared with other clients, used when the
+                client creates its own session
+            guard: Rate limiter and circuit breaker to use instead of the
+                one shared by all clients of the portal host
+            streaming: Read the Tank page in chunks and stop at the end of
+                its body, instead of reading the whole response
+            max_page_size: Largest Tank page accepted, in bytes
 
         """
         self.email = email
         self.password = password
         self.base_url = base_url.rstrip("/")
-        self._session: aiohttp.ClientSession | None = None
+        self.parser_backend = parser_backend
+        self.parse_in_executor = parse_in_executor
+        # Cumulative parse time, and how long the event loop was held up
+        # meanwhile: the parse itself when inline, else the measured loop lag
+        self.parse_time = 0.0
+        self.loop_blocked_time = 0.0
+        # Timings of each request and parse phase, and traffic counters
+        self.metrics = RefreshMetrics()
+        self._session: aiohttp.ClientSession | None = session
+        self._owns_session = session is None or owns_session
+        self._connector = connector
+        # The shared guard of the host is looked up on first use, on the loop
+        # the client runs on
+        self._guard = guard
+        self.streaming = streaming
+        self.max_page_size = max_page_size
+        # Login in progress, shared by concurrent callers, and when the last
+        # one succeeded
+        self._login_task: asyncio.Task[bool] | None = None
+        self._authenticated_at: float | None = None
+        # Tank page the last login was redirected to, and when
+        self._landing_page: tuple[float, str] | None = None
+        # Change detection for the Tank page
+        self._validators: dict[str, str] = {}
+        self._fingerprint: bytes | None = None
+        self._tank_data: dict[str, TankReading] | None = None
+
+    @property
+    def guard(self) -> HostGuard:
+        """Return the rate limiter and circuit breaker of the client."""
+        if self._guard is None:
+            self._guard = host_guard(URL(self.base_url).host or self.base_url)
+        return self._guard
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            if self._connector is not None:
+                self._session = aiohttp.ClientSession(
+                    connector=self._connector, connector_owner=False
+                )
+            else:
+                self._session = aiohttp.ClientSession(connector=create_connector())
+            self._owns_session = True
         return self._session
 
+    @asynccontextmanager
+    async def _request(
+        self, method: str, url: str, phase: str | None = None, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request through the host's rate limiter and circuit breaker.
+
+        If a phase is given, the time from sending the request until the
+        block exits, reading the body included, is recorded as that phase.
+        Waiting for the rate limiter is not.
+
+        Raises:
+            CircuitOpenError: If requests to the host are paused
+
+        """
+        session = await self._get_session()
+        await self.guard.async_before_request()
+        start = time.perf_counter()
+        try:
+            response = await session.request(method, url, **kwargs)
+        except (aiohttp.ClientError, TimeoutError):
+            self.guard.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, or failed without reaching the host, like on a closed
+            # session or a bad URL; don't keep the half-open trial reserved
+            self.guard.breaker.cancel_request()
+            raise
+        try:
+            self.guard.record_response(
+                response.status, response.headers.get("Retry-After")
+            )
+            yield response
+        finally:
+            response.release()
+            if phase is not None:
+                self.metrics.record(phase, time.perf_counter() - start)
+
+    def export_cookies(self) -> list[dict[str, str]]:
+        """Return the session cookies, to restore them after a restart."""
+        if self._session is None or self._session.closed:
+            return []
+        return [
+            {
+                "name": morsel.key,
+                "value": morsel.value,
+                "domain": morsel["domain"],
+                "path": morsel["path"],
+            }
+            for morsel in self._session.cookie_jar
+        ]
+
+    async def async_restore_cookies(self, cookies: list[dict[str, str]]) -> None:
+        """Restore session cookies saved with export_cookies.
+
+        Requests then use the restored login; if the portal has expired it,
+        the next request raises AuthenticationError and a login is needed.
+        """
+        session = await self._get_session()
+        response_url = URL(self.base_url)
+        for cookie in cookies:
+            morsel: Morsel[str] = Morsel()
+            morsel.set(cookie["name"], cookie["value"], cookie["value"])
+            morsel["domain"] = cookie.get("domain", "")
+            morsel["path"] = cookie.get("path", "/")
+            session.cookie_jar.update_cookies(
+                {cookie["name"]: morsel}, response_url=response_url
+            )
+        _LOGGER.debug("Restored %d session cookies", len(cookies))
+
+    async def _async_parse(
+        self, phase: str, parse: Callable[..., _T], html: str, *args: Any
+    ) -> _T:
+        """Run a page parser, on a worker thread unless disabled.
+
+        HTTP I/O stays on the event loop; only the CPU-bound extraction is
+        handed to the executor. The parser is called with the page, the
+        parser backend and any further arguments, and timed as the phase.
+        """
+        start = time.perf_counter()
+        if self.parse_in_executor:
+            loop = asyncio.get_running_loop()
+            # A worker thread still holds up the loop while it holds the GIL
+            probe = _LoopLagProbe(loop)
+            try:
+                return await loop.run_in_executor(
+                    None, parse, html, self.parser_backend, *args
+                )
+            finally:
+                self._record_parse(phase, parse, start, probe.stop())
+
+        try:
+            return parse(html, self.parser_backend, *args)
+        finally:
+            self._record_parse(phase, parse, start, time.perf_counter() - start)
+
+    def _record_parse(
+        self, phase: str, parse: Callable[..., Any], start: float, blocked: float
+    ) -> None:
+        """Record how long a parse took and how long the loop was blocked."""
+        elapsed = time.perf_counter() - start
+        self.parse_time += elapsed
+        self.loop_blocked_time += blocked
+        self.metrics.record(phase, elapsed)
+        _LOGGER.debug(
+            "%s took %.1f ms, the event loop was blocked for %.1f ms",
+            parse.__name__,
+            elapsed * 1000,
+            blocked * 1000,
+        )
+
+    def _record_parse_stats(self, stats: ParseStats) -> None:
+        """Add the extractor timings and fallbacks of a parse to the metrics."""
+        for name, seconds in stats.timings.items():
+            self.metrics.record(f"parse.{name}", seconds)
+        for name, count in stats.fallbacks.items():
+            self.metrics.increment(COUNTER_PARSE_FALLBACKS, count)
+            self.metrics.increment(f"{COUNTER_PARSE_FALLBACKS}.{name}", count)
+
+    async def _async_read_text(self, response: aiohttp.ClientResponse) -> str:
+        """Read a whole response body as text, counting the bytes received."""
+        body = await response.read()
+        self.metrics.increment(COUNTER_BYTES_RECEIVED, len(body))
+        return await response.text()
+
     async def async_login(self) -> bool:
         """Authenticate with MyFuelPortal.
 
+        Concurrent calls share a single login, and a login that succeeded
+        less than RECENT_LOGIN_SECONDS ago is reused, so refreshes that hit
+        the same expired session don't log in over each other.
+
         Returns:
             True if authentication successful
 
@@ -64,28 +349,43 @@ class MyFuelPortalAPI:
             ConnectionError: If unable to connect to the service
 
         """
+        if self._login_task is None:
+            if (
+                self._authenticated_at is not None
+                and (age := time.monotonic() - self._authenticated_at)
+                < RECENT_LOGIN_SECONDS
+            ):
+                _LOGGER.debug("Reusing the login of %.0f s ago", age)
+                return True
+            self._login_task = asyncio.get_running_loop().create_task(
+                self._async_login()
+            )
+            self._login_task.add_done_callback(self._login_done)
+        # A cancelled caller must not cancel the login the others wait for
+        return await asyncio.shield(self._login_task)
+
+    def _login_done(self, task: asyncio.Task[bool]) -> None:
+        """Clear the finished login so the next call starts a new one."""
+        self._login_task = None
+        if not task.cancelled() and task.exception() is None:
+            self._authenticated_at = time.monotonic()
+
+    async def _async_login(self) -> bool:
+        """Run the login page GET, token parse and credentials POST."""
         try:
-            session = await self._get_session()
-
             # Step 1: GET login page to extract CSRF token
             login_url = f"{self.base_url}/Account/Login"
             _LOGGER.debug("Fetching login page from %s", login_url)
             
-            async with session.get(login_url) as response:
+            async with self._request("GET", login_url, phase=PHASE_LOGIN_GET) as response:
                 if response.status != 200:
                     raise ConnectionError(
                         f"Failed to load login page: HTTP {response.status}"
                     )
-                html = await response.text()
+                html = await self._async_read_text(response)
 
             # Parse HTML to extract CSRF token
-            soup = BeautifulSoup(html, "html.parser")
-            token_input = soup.find("input", {"name": "__RequestVerificationToken"})
-            
-            if not token_input or not token_input.get("value"):
-                raise ParsingError("Could not find CSRF token in login page")
-
-            csrf_token = token_input["value"]
+            csrf_token = await self._async_parse(PHASE_CSRF_PARSE, parse_csrf_token, html)
             _LOGGER.debug("Extracted CSRF token")
 
             # Step 2: POST credentials with CSRF token
@@ -98,19 +398,24 @@ class MyFuelPortalAPI:
             }
 
             _LOGGER.debug("Submitting login credentials")
-            async with session.post(login_post_url, data=form_data) as response:
+            async with self._request(
+                "POST", login_post_url, phase=PHASE_LOGIN_POST, data=form_data
+            ) as response:
                 # Check if login was successful
                 # Successful login should redirect to /Tank page (302 or 200)
                 if response.status in (200, 302):
                     # Check if we're actually logged in by looking at the response
                     # If redirected back to login page or login form present, auth failed
-                    response_text = await response.text()
+                    response_text = await self._async_read_text(response)
                     
                     # If we see the login form again, authentication failed
                     if "Account/Login" in str(response.url) or "id=\"EmailAddress\"" in response_text:
                         raise AuthenticationError("Invalid email or password")
                     
                     _LOGGER.info("Successfully authenticated to MyFuelPortal")
+                    self.metrics.increment(COUNTER_LOGINS)
+                    if response.url.path.rstrip("/").lower() == "/tank":
+                        self._landing_page = (time.monotonic(), response_text)
                     return True
                 elif response.status == 401 or response.status == 403:
                     raise AuthenticationError("Invalid email or password")
@@ -121,19 +426,100 @@ class MyFuelPortalAPI:
 
         except aiohttp.ClientError as err:
             raise ConnectionError(f"Connection error: {err}") from err
-        except AuthenticationError:
-            raise
-        except ParsingError:
+        except (AuthenticationError, ConnectionError, ParsingError):
             raise
         except Exception as err:
             _LOGGER.exception("Unexpected error during login")
             raise ConnectionError(f"Unexpected error: {err}") from err
 
-    async def async_get_tank_data(self) -> dict[str, Any]:
+    async def _async_fetch_tank_page(self) -> str | None:
+        """Fetch the Tank page, or return None if it was not modified."""
+        tank_url = f"{self.base_url}/Tank"
+        _LOGGER.debug("Fetching tank data from %s", tank_url)
+
+        # Let the portal answer 304 if the page has not changed
+        headers = {}
+        if self._tank_data is not None:
+            if etag := self._validators.get("ETag"):
+                headers["If-None-Match"] = etag
+            if last_modified := self._validators.get("Last-Modified"):
+                headers["If-Modified-Since"] = last_modified
+
+        async with self._request(
+            "GET", tank_url, phase=PHASE_TANK_FETCH, headers=headers
+        ) as response:
+            if response.status == 401 or response.status == 403:
+                raise AuthenticationError("Session expired, please re-authenticate")
+
+            if response.status == 304 and self._tank_data is not None:
+                self.metrics.increment(COUNTER_NOT_MODIFIED)
+                return None
+
+            if response.status != 200:
+                raise ConnectionError(
+                    f"Failed to fetch tank data: HTTP {response.status}"
+                )
+
+            # Check if we were redirected to login (session expired)
+            if "Account/Login" in str(response.url):
+                raise AuthenticationError("Session expired, please re-authenticate")
+
+            if self.streaming:
+                html = await self._async_read_tank_page(response)
+            else:
+                html = await self._async_read_text(response)
+            self._validators = {
+                header: response.headers[header]
+                for header in ("ETag", "Last-Modified")
+                if header in response.headers
+            }
+        return html
+
+    async def _async_read_tank_page(self, response: aiohttp.ClientResponse) -> str:
+        """Read the Tank page in chunks, up to the end of its body.
+
+        Anything after the body is not read; the connection is closed
+        instead of draining the rest of the response.
+
+        Raises:
+            ParsingError: If the page is larger than max_page_size
+
+        """
+        reader = TankPageReader()
+        decoder = _incremental_decoder(response.charset)
+        size = 0
+        async for chunk in response.content.iter_chunked(_CHUNK_SIZE):
+            size += len(chunk)
+            self.metrics.increment(COUNTER_BYTES_RECEIVED, len(chunk))
+            if size > self.max_page_size:
+                raise ParsingError(
+                    f"Tank page is larger than {self.max_page_size} bytes"
+                )
+            if reader.feed(decoder.decode(chunk)):
+                _LOGGER.debug("Read %d bytes of the Tank page", size)
+                return reader.html
+        reader.feed(decoder.decode(b"", final=True))
+        return reader.html
+
+    def _take_landing_page(self) -> str | None:
+        """Return the Tank page the last login landed on, once, if recent."""
+        if self._landing_page is None:
+            return None
+        landed_at, html = self._landing_page
+        self._landing_page = None
+        if time.monotonic() - landed_at >= RECENT_LOGIN_SECONDS:
+            return None
+        _LOGGER.debug("Using the Tank page the login landed on")
+        return html
+
+    async def async_get_tank_data(self) -> dict[str, TankReading]:
         """Fetch tank data from MyFuelPortal.
 
+        The previous result is returned as is when the portal answers 304
+        or the page fingerprint did not change.
+
         Returns:
-            Dictionary with tank_level_percent and gallons_remaining
+            Dictionary of tank readings keyed by tank id, in page order
 
         Raises:
             AuthenticationError: If session expired
@@ -142,194 +528,90 @@ class MyFuelPortalAPI:
 
         """
         try:
-            session = await self._get_session()
+            # Right after a login the portal lands on the Tank page; use it
+            # instead of fetching the page again
+            html = self._take_landing_page()
+            if html is None:
+                html = await self._async_fetch_tank_page()
+            if html is None:
+                _LOGGER.debug("Tank page not modified, reusing previous data")
+                return self._tank_data
+
+            # Skip the extraction if the data region of the page is unchanged
+            fingerprint = page_fingerprint(html)
+            if fingerprint == self._fingerprint and self._tank_data is not None:
+                _LOGGER.debug("Tank page unchanged, reusing previous data")
+                self.metrics.increment(COUNTER_UNCHANGED_PAGES)
+                return self._tank_data
+
+            # Parse the HTML to extract tank data
+            stats = ParseStats()
+            try:
+                data = await self._async_parse(
+                    PHASE_TANK_PARSE, parse_tank_page, html, stats
+                )
+            finally:
+                self._record_parse_stats(stats)
+            self._fingerprint = fingerprint
+            self._tank_data = data
+            return data
+
+        except aiohttp.ClientError as err:
+            raise ConnectionError(f"Connection error: {err}") from err
+        except (AuthenticationError, ConnectionError, ParsingError):
+            raise
+        except Exception as err:
+            _LOGGER.exception("Unexpected error fetching tank data")
+            raise ParsingError(f"Unexpected error: {err}") from err
 
-            # Fetch the Tank page
-            tank_url = f"{self.base_url}/Tank"
-            _LOGGER.debug("Fetching tank data from %s", tank_url)
+    async def async_get_delivery_page(self, page: int = 1) -> DeliveryPage:
+        """Fetch one page of the delivery history, newest deliveries first.
 
-            async with session.get(tank_url) as response:
+        Returns:
+            The deliveries on the page and the number of the last page
+
+        Raises:
+            AuthenticationError: If session expired
+            ParsingError: If unable to parse the delivery history
+            ConnectionError: If unable to connect
+
+        """
+        delivery_url = f"{self.base_url}/Deliveries"
+        _LOGGER.debug("Fetching delivery history page %d from %s", page, delivery_url)
+        try:
+            async with self._request(
+                "GET",
+                delivery_url,
+                phase=PHASE_DELIVERY_FETCH,
+                params={"page": str(page)},
+            ) as response:
                 if response.status == 401 or response.status == 403:
                     raise AuthenticationError("Session expired, please re-authenticate")
-                
+
                 if response.status != 200:
                     raise ConnectionError(
-                        f"Failed to fetch tank data: HTTP {response.status}"
+                        f"Failed to fetch delivery history: HTTP {response.status}"
                     )
 
-                html = await response.text()
-
-                # Check if we were redirected to login (session expired)
                 if "Account/Login" in str(response.url):
                     raise AuthenticationError("Session expired, please re-authenticate")
 
-            # Parse the HTML to extract tank data
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Extract tank level percentage from progress bar
-            progress_bar = soup.find("div", {"class": "progress-bar", "role": "progressbar"})
-            if not progress_bar or not progress_bar.get("aria-valuenow"):
-                raise ParsingError("Could not find tank level in page")
+                html = await self._async_read_text(response)
 
-            try:
-                tank_level_percent = float(progress_bar["aria-valuenow"])
-            except (ValueError, TypeError) as err:
-                raise ParsingError(f"Invalid tank level value: {err}") from err
-
-            # Extract gallons remaining from text
-            # Look for pattern like "Approximately 41 gallons in tank"
-            gallons_remaining = None
-            for div in soup.find_all("div"):
-                text = div.get_text(strip=True)
-                if "gallons in tank" in text.lower():
-                    # Extract the number
-                    match = re.search(r"(\d+\.?\d*)\s*gallons", text, re.IGNORECASE)
-                    if match:
-                        try:
-                            gallons_remaining = float(match.group(1))
-                            break
-                        except ValueError:
-                            pass
-
-            if gallons_remaining is None:
-                _LOGGER.warning("Could not find gallons remaining in page")
-                gallons_remaining = 0.0
-
-            # Extract tank capacity and fuel type from text
-            # Look for pattern like "125 Gal Propane" or "500 Gallon Propane" or "125 gal. | PROPANE"
-            tank_capacity = None
-            fuel_type = None
-            # Search all text for capacity pattern
-            capacity_pattern = re.compile(r'(\d+\.?\d*)\s*(Gal\.?|Gallon)(?:\s*\|\s*|\s+)(\w+)', re.IGNORECASE)
-            for element in soup.find_all(text=capacity_pattern):
-                text = element.strip()
-                match = capacity_pattern.search(text)
-                if match:
-                    try:
-                        tank_capacity = float(match.group(1))
-                        fuel_type = match.group(3).upper()
-                        break
-                    except ValueError:
-                        pass
-
-            # If not found with fuel type, try just capacity
-            if tank_capacity is None:
-                simple_capacity_pattern = re.compile(r'(\d+\.?\d*)\s*(Gal\.?|Gallon)', re.IGNORECASE)
-                for element in soup.find_all(text=simple_capacity_pattern):
-                    text = element.strip()
-                    match = simple_capacity_pattern.search(text)
-                    if match:
-                        try:
-                            tank_capacity = float(match.group(1))
-                            break
-                        except ValueError:
-                            pass
-
-            if tank_capacity is None:
-                _LOGGER.warning("Could not find tank capacity in page")
-                tank_capacity = 0.0
-
-            if fuel_type is None:
-                _LOGGER.debug("Could not find fuel type in page")
-
-            # Extract last delivery date
-            # Look for pattern like "Last Delivery: 01/15/2024" or similar date format
-            last_delivery_date = None
-            # Search for "last delivery" text (case insensitive)
-            for element in soup.find_all(text=re.compile(r'last\s+delivery', re.IGNORECASE)):
-                parent_text = element.parent.get_text(strip=True) if element.parent else element
-                # Look for date pattern MM/DD/YYYY or similar
-                date_match = re.search(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', str(parent_text))
-                if date_match:
-                    last_delivery_date = date_match.group(1)
-                    break
-
-            if last_delivery_date is None:
-                _LOGGER.debug("Could not find last delivery date in page")
-
-            # Extract reading date (tank level reading date)
-            # Look for pattern like "Reading Date: 01/15/2024", "Last Reading: 01/15/2024", or "Tank Reading: 01/15/2024"
-            reading_date = None
-            # Search for "reading" or "tank reading" text (case insensitive)
-            for element in soup.find_all(text=re.compile(r'(reading\s+date|last\s+reading|tank\s+reading)', re.IGNORECASE)):
-                parent_text = element.parent.get_text(strip=True) if element.parent else element
-                # Look for date pattern MM/DD/YYYY or MM-DD-YYYY
-                date_match = re.search(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', str(parent_text))
-                if date_match:
-                    reading_date = date_match.group(1)
-                    break
-
-            if reading_date is None:
-                _LOGGER.debug("Could not find reading date in page")
-
-            # Extract current fuel price
-            # Look for price patterns like "$3.1400 / gal" or "$2.50/gal"
-            current_price = None
-            # Search for price in various formats - look at all text content
-            price_pattern = re.compile(r'\$\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
-            
-            # First, search all text elements that contain a dollar sign
-            for element in soup.find_all(text=price_pattern):
-                text = element.strip()
-                # Try to get parent's full text to get context
-                parent_text = element.parent.get_text(strip=True) if element.parent else text
-                
-                # Look for price context (current, price, per, gal, gallon, /)
-                if any(keyword in parent_text.lower() for keyword in ['price', 'current', 'per', 'gal', '/']):
-                    match = price_pattern.search(text)
-                    if match:
-                        try:
-                            current_price = float(match.group(1))
-                            _LOGGER.debug("Found price in text element: %s (parent: %s)", text, parent_text)
-                            break
-                        except ValueError:
-                            pass
-            
-            # If not found, search all elements for dollar amounts near "gal" or "price"
-            if current_price is None:
-                all_text = soup.get_text()
-                match = re.search(r'\$\s*(\d+(?:\.\d+)?)\s*(?:/\s*gal|per\s*gal)', all_text, re.IGNORECASE)
-                if match:
-                    try:
-                        current_price = float(match.group(1))
-                        _LOGGER.debug("Found price in full text: %s", match.group(0))
-                    except ValueError:
-                        pass
-
-            if current_price is None:
-                _LOGGER.debug("Could not find current price in page")
-
-            _LOGGER.debug(
-                "Parsed tank data: level=%s%%, gallons=%s, capacity=%s, fuel_type=%s, last_delivery=%s, reading_date=%s, price=%s",
-                tank_level_percent,
-                gallons_remaining,
-                tank_capacity,
-                fuel_type,
-                last_delivery_date,
-                reading_date,
-                current_price,
+            return await self._async_parse(
+                PHASE_DELIVERY_PARSE, parse_delivery_page, html
             )
 
-            return {
-                "tank_level_percent": tank_level_percent,
-                "gallons_remaining": gallons_remaining,
-                "tank_capacity": tank_capacity,
-                "fuel_type": fuel_type,
-                "last_delivery_date": last_delivery_date,
-                "reading_date": reading_date,
-                "current_price": current_price,
-            }
-
         except aiohttp.ClientError as err:
             raise ConnectionError(f"Connection error: {err}") from err
-        except (AuthenticationError, ParsingError):
+        except (AuthenticationError, ConnectionError, ParsingError):
             raise
         except Exception as err:
-            _LOGGER.exception("Unexpected error fetching tank data")
+            _LOGGER.exception("Unexpected error fetching delivery history")
             raise ParsingError(f"Unexpected error: {err}") from err
 
     async def async_close(self) -> None:
-        """Close the API session."""
-        if self._session and not self._session.closed:
+        """Close the API session, unless the caller kept ownership of it."""
+        if self._session and self._owns_session and not self._session.closed:
             await self._session.close()
             self._session = None
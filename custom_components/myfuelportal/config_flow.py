@@ -8,12 +8,24 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .api import MyFuelPortalAPI, AuthenticationError, ConnectionError as APIConnectionError
-from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .const import (
+    CONF_EMAIL,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_PASSWORD,
+    CONF_RESERVE_LEVEL,
+    DATA_VALIDATED_CLIENTS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_RESERVE_LEVEL,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,23 +42,36 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    The logged in client is returned under "api", so setup can use it instead
+    of logging in again. The client owns its session, so closing the client
+    closes it.
     """
-    api = MyFuelPortalAPI(data[CONF_EMAIL], data[CONF_PASSWORD])
-    
+    api = MyFuelPortalAPI(
+        data[CONF_EMAIL],
+        data[CONF_PASSWORD],
+        session=async_create_clientsession(hass, auto_cleanup=False),
+        owns_session=True,
+    )
+
+    logged_in = False
     try:
         # Try to authenticate with the provided credentials
         result = await api.async_login()
         if not result:
             raise InvalidAuth
+        logged_in = True
     except AuthenticationError as err:
         raise InvalidAuth from err
     except APIConnectionError as err:
         raise CannotConnect from err
     finally:
-        await api.async_close()
+        if not logged_in:
+            # The session only holds this validation's cookies, the pooled
+            # connections stay open for reuse
+            await api.async_close()
 
     # Return info to be stored in the config entry
-    return {"title": data[CONF_EMAIL]}
+    return {"title": data[CONF_EMAIL], "api": api}
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -54,6 +79,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        # Client handed over to async_setup_entry
+        self._api: MyFuelPortalAPI | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -61,6 +99,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            # Create the config entry with a unique ID based on email
+            await self.async_set_unique_id(user_input[CONF_EMAIL])
+            self._abort_if_unique_id_configured()
+
             try:
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
@@ -71,10 +113,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                # Create the config entry with a unique ID based on email
-                await self.async_set_unique_id(user_input[CONF_EMAIL])
-                self._abort_if_unique_id_configured()
-                
+                # Hand the logged in client over to async_setup_entry; if no
+                # entry takes it over, async_remove closes it
+                validated = self.hass.data.setdefault(DOMAIN, {}).setdefault(
+                    DATA_VALIDATED_CLIENTS, {}
+                )
+                validated[self.unique_id] = self._api = info["api"]
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         # Show the configuration form
@@ -84,6 +128,65 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    @callback
+    def async_remove(self) -> None:
+        """Close the validated client if no entry took it over.
+
+        Runs once the flow finished or was aborted. The entry is set up
+        before then, so a client still waiting belongs to an entry that was
+        not created, for example because the account was added by another
+        flow in the meantime.
+        """
+        if self._api is None:
+            return
+        data = self.hass.data.get(DOMAIN, {})
+        validated = data.get(DATA_VALIDATED_CLIENTS, {})
+        if validated.get(self.unique_id) is self._api:
+            del validated[self.unique_id]
+            self.hass.async_create_task(self._api.async_close())
+        if not validated:
+            data.pop(DATA_VALIDATED_CLIENTS, None)
+        self._api = None
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle MyFuelPortal options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling interval bounds and the reserve level."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_UPDATE_INTERVAL] > user_input[CONF_MAX_UPDATE_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_MIN_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Required(
+                    CONF_MAX_UPDATE_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+                vol.Required(
+                    CONF_RESERVE_LEVEL,
+                    default=options.get(CONF_RESERVE_LEVEL, DEFAULT_RESERVE_LEVEL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
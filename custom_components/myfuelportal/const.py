@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
+
 # Domain name for this integration
 DOMAIN = "myfuelportal"
 
 # Configuration keys
 CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
+# Tank that keeps the entity IDs of single tank setups, saved when first chosen
+CONF_PRIMARY_TANK = "primary_tank"
 
 # Default values
 DEFAULT_NAME = "MyFuelPortal"
@@ -15,6 +19,33 @@ DEFAULT_NAME = "MyFuelPortal"
 #DEFAULT_UPDATE_INTERVAL = 300  # seconds (5 minutes)
 DEFAULT_UPDATE_INTERVAL = 28800  # seconds (8 hours)
 
+# Options: bounds of the adaptive polling interval
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MIN_UPDATE_INTERVAL = 30  # minutes
+DEFAULT_MAX_UPDATE_INTERVAL = DEFAULT_UPDATE_INTERVAL // 60  # minutes
+
+# Options: tank level kept in reserve, for the days until reserve forecast
+CONF_RESERVE_LEVEL = "reserve_level"
+DEFAULT_RESERVE_LEVEL = 20  # percent
+
+# Fleet scheduler shared by all accounts, stored in hass.data[DOMAIN]
+DATA_FLEET_SCHEDULER = "fleet_scheduler"
+FLEET_MAX_CONCURRENT_REQUESTS = 4
+FLEET_JITTER_FRACTION = 0.1  # of the poll interval
+FLEET_MAX_JITTER = timedelta(minutes=5)
+
+# Clients logged in by the config flow, keyed by unique ID, waiting for
+# async_setup_entry to take them over
+DATA_VALIDATED_CLIENTS = "validated_clients"
+
+# Storage
+STORAGE_VERSION = 1
+STORAGE_SESSION_DELAY = 10  # seconds to coalesce session cookie saves
+STORAGE_SCHEDULE_DELAY = 60  # seconds to coalesce polling schedule saves
+STORAGE_SNAPSHOT_DELAY = 60  # seconds to coalesce tank data snapshot saves
+STORAGE_DELIVERIES_DELAY = 10  # seconds to coalesce delivery history saves
+
 # Sensor attribute keys
 ATTR_TANK_LEVEL = "tank_level_percent"
 ATTR_GALLONS_REMAINING = "gallons_remaining"
@@ -23,3 +54,21 @@ ATTR_FUEL_TYPE = "fuel_type"
 ATTR_LAST_DELIVERY_DATE = "last_delivery_date"
 ATTR_READING_DATE = "reading_date"
 ATTR_CURRENT_PRICE = "current_price"
+
+# Extra state attributes
+ATTR_DATA_FETCHED = "data_fetched"
+ATTR_FROM_SNAPSHOT = "from_snapshot"
+
+# Sent after every refresh, formatted with the entry ID
+SIGNAL_METRICS_UPDATED = f"{DOMAIN}_metrics_updated_{{}}"
+
+# Fired for every new delivery, seen in the delivery history or as a refill
+# in the tank level
+EVENT_DELIVERY = f"{DOMAIN}_delivery"
+DELIVERY_SOURCE_PORTAL = "portal"
+DELIVERY_SOURCE_LEVEL = "level"
+
+# Services
+SERVICE_IMPORT_STATISTICS = "import_statistics"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
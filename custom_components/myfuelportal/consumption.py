@@ -0,0 +1,134 @@
+"""Fuel consumption estimates for MyFuelPortal."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import NamedTuple
+
+from .history import HistoryPoint
+from .models import TankReading
+
+_LOGGER = logging.getLogger(__name__)
+
+_SECONDS_PER_DAY = 86400
+
+# Readings used for the fit
+USAGE_WINDOW = timedelta(days=30)
+# A level rise of this many percentage points is a delivery
+REFILL_THRESHOLD = 5.0
+# Readings and days the fit needs before it is trusted
+_MIN_POINTS = 3
+_MIN_SPAN = 2.0  # days
+
+
+class UsageForecast(NamedTuple):
+    """Estimated consumption of a tank."""
+
+    daily_usage: float  # gallons per day
+    days_until_reserve: float | None
+    empty_at: datetime | None
+
+
+class UsageEstimator:
+    """Fit the gallons of a tank over time on a sliding window.
+
+    The least squares line is kept as running sums, so a new reading is
+    added and the readings leaving the window are removed in constant
+    time, without refitting the whole window. A delivery, seen as a jump
+    in the level, starts a new fit: only the readings since the last
+    delivery describe the current consumption.
+    """
+
+    def __init__(
+        self,
+        window: timedelta = USAGE_WINDOW,
+        refill_threshold: float = REFILL_THRESHOLD,
+    ) -> None:
+        """Initialize an empty fit."""
+        self.window = window.total_seconds() / _SECONDS_PER_DAY
+        self.refill_threshold = refill_threshold
+        self.refills = 0
+        self._points: deque[tuple[float, float]] = deque()
+        self._origin: float | None = None
+        self._last_level: float | None = None
+        self._last_time: float | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget the readings of the fit."""
+        self._points.clear()
+        self._origin = None
+        self._n = 0
+        self._sum_t = 0.0
+        self._sum_g = 0.0
+        self._sum_tt = 0.0
+        self._sum_tg = 0.0
+
+    def add(self, point: HistoryPoint) -> bool:
+        """Add a reading to the fit and return True if it follows a refill."""
+        refilled = self._last_level is not None and (
+            point.level - self._last_level >= self.refill_threshold
+        )
+        if refilled:
+            _LOGGER.debug(
+                "Level rose from %s%% to %s%%, starting a new fit after the delivery",
+                self._last_level,
+                point.level,
+            )
+            self.refills += 1
+            self._reset()
+        self._last_level = point.level
+        self._last_time = point.timestamp
+        if point.gallons is None:
+            return refilled
+
+        if self._origin is None:
+            self._origin = point.timestamp
+        # Days since the first reading of the fit keep the sums well scaled
+        t = (point.timestamp - self._origin) / _SECONDS_PER_DAY
+        self._points.append((t, point.gallons))
+        self._n += 1
+        self._sum_t += t
+        self._sum_g += point.gallons
+        self._sum_tt += t * t
+        self._sum_tg += t * point.gallons
+
+        while self._points and self._points[0][0] < t - self.window:
+            old_t, old_g = self._points.popleft()
+            self._n -= 1
+            self._sum_t -= old_t
+            self._sum_g -= old_g
+            self._sum_tt -= old_t * old_t
+            self._sum_tg -= old_t * old_g
+        return refilled
+
+    def slope(self) -> float | None:
+        """Return the fitted change in gallons per day, if there is a fit."""
+        if self._n < _MIN_POINTS or self._points[-1][0] - self._points[0][0] < _MIN_SPAN:
+            return None
+        denominator = self._n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (self._n * self._sum_tg - self._sum_t * self._sum_g) / denominator
+
+    def forecast(self, reading: TankReading, reserve_percent: float) -> UsageForecast | None:
+        """Return the consumption forecast from the current reading."""
+        slope = self.slope()
+        if slope is None:
+            return None
+        # Rising gallons between deliveries are measurement noise
+        daily_usage = max(0.0, -slope)
+        gallons = reading.gallons_remaining
+        if not daily_usage or gallons is None or self._last_time is None:
+            return UsageForecast(daily_usage, None, None)
+
+        days_until_reserve = None
+        if reading.tank_capacity:
+            reserve = reading.tank_capacity * reserve_percent / 100
+            days_until_reserve = max(0.0, (gallons - reserve) / daily_usage)
+        empty_at = datetime.fromtimestamp(self._last_time, timezone.utc) + timedelta(
+            days=gallons / daily_usage
+        )
+        return UsageForecast(daily_usage, days_until_reserve, empty_at)
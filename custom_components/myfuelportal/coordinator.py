@@ -2,58 +2,398 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from datetime import datetime, timedelta
 import logging
+import time
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
 from .api import MyFuelPortalAPI, AuthenticationError, ConnectionError as APIConnectionError
-from .const import DEFAULT_UPDATE_INTERVAL, DOMAIN
+from .exceptions import MyFuelPortalAPIError
+from .const import (
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_RESERVE_LEVEL,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_RESERVE_LEVEL,
+    DELIVERY_SOURCE_LEVEL,
+    DELIVERY_SOURCE_PORTAL,
+    DOMAIN,
+    EVENT_DELIVERY,
+    SIGNAL_METRICS_UPDATED,
+    STORAGE_DELIVERIES_DELAY,
+    STORAGE_SCHEDULE_DELAY,
+    STORAGE_SESSION_DELAY,
+    STORAGE_SNAPSHOT_DELAY,
+    STORAGE_VERSION,
+)
+from .consumption import UsageEstimator, UsageForecast
+from .deliveries import DeliveryLog
+from .history import HistoryPoint, ReadingHistory
+from .metrics import COUNTER_REAUTHS, PHASE_FLEET_WAIT, PHASE_REFRESH
+from .models import Delivery, TankReading
+from .schedule import ReadingSchedule
+from .scheduler import FleetScheduler
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
 
+    from .parser import DeliveryPage
+
 _LOGGER = logging.getLogger(__name__)
 
 
-class MyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+class MyCoordinator(DataUpdateCoordinator[dict[str, TankReading]]):
     """Class to manage fetching data from the API."""
 
     def __init__(
-        self, hass: HomeAssistant, entry: ConfigEntry, api: MyFuelPortalAPI
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: MyFuelPortalAPI,
+        fleet: FleetScheduler,
     ) -> None:
         """Initialize the coordinator."""
+        # Polls follow the learned reading schedule, within the configured bounds
+        self.schedule = ReadingSchedule(
+            timedelta(
+                minutes=entry.options.get(
+                    CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                )
+            ),
+            timedelta(
+                minutes=entry.options.get(
+                    CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                )
+            ),
+        )
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_UPDATE_INTERVAL),
+            update_interval=self.schedule.max_interval,
+            # The portal updates readings about once a day; don't notify
+            # listeners when a refresh returns the same data
+            always_update=False,
         )
         self.entry = entry
         self.api = api
+        self.fleet = fleet
+        self.last_success_time: float | None = None
+        self._session_store = session_store(hass, entry.entry_id)
+        self._saved_cookies: list[dict[str, str]] = []
+        self._schedule_store = schedule_store(hass, entry.entry_id)
+        self._snapshot_store = snapshot_store(hass, entry.entry_id)
+        self.history = ReadingHistory(history_path(hass, entry.entry_id))
+        # Consumption fit of each tank, updated with every new reading
+        self.reserve_level: float = entry.options.get(
+            CONF_RESERVE_LEVEL, DEFAULT_RESERVE_LEVEL
+        )
+        self.usage: dict[str, UsageEstimator] = {}
+        self.forecasts: dict[str, UsageForecast | None] = {}
+        self.deliveries = DeliveryLog()
+        self._deliveries_store = deliveries_store(hass, entry.entry_id)
+        # Syncs run one at a time; polls start them in the background
+        self._deliveries_lock = asyncio.Lock()
+        self._deliveries_task: asyncio.Task[None] | None = None
+        # When the current data was fetched from the portal, and whether it
+        # was restored from the snapshot of a previous run
+        self.data_fetched: datetime | None = None
+        self.from_snapshot = False
+
+    async def _async_setup(self) -> None:
+        """Restore the polling schedule, reading and delivery history before the first refresh."""
+        if stored := await self._schedule_store.async_load():
+            self.schedule.restore(stored)
+        if stored := await self._deliveries_store.async_load():
+            self.deliveries.restore(stored)
+        await self.hass.async_add_executor_job(self.history.load)
+        for tank_id, history in self.history.tanks.items():
+            estimator = self.usage[tank_id] = UsageEstimator()
+            for point in history:
+                estimator.add(point)
+
+    async def async_restore_session(self) -> bool:
+        """Restore the session cookies saved by a previous run.
+
+        Returns:
+            True if cookies were restored and a login can be skipped
+
+        """
+        stored = await self._session_store.async_load()
+        if not stored or not stored.get("cookies"):
+            return False
+        self._saved_cookies = stored["cookies"]
+        await self.api.async_restore_cookies(self._saved_cookies)
+        return True
+
+    async def async_restore_snapshot(self) -> bool:
+        """Show the last good data saved by a previous run.
+
+        Returns:
+            True if data was restored and the first refresh can run in the
+            background
+
+        """
+        stored = await self._snapshot_store.async_load()
+        if not stored or not stored.get("data"):
+            return False
+        await self._async_setup()
+        self.data_fetched = datetime.fromisoformat(stored["fetched"])
+        self.from_snapshot = True
+        _LOGGER.debug("Restored tank data fetched at %s", self.data_fetched)
+        data = {
+            tank_id: TankReading.from_dict(reading)
+            for tank_id, reading in stored["data"].items()
+        }
+        self._async_update_forecasts(data)
+        self.async_set_updated_data(data)
+        return True
+
+    def _async_save_snapshot(self, data: dict[str, TankReading]) -> None:
+        """Schedule a save of the last good data."""
+        fetched = self.data_fetched
+        self._snapshot_store.async_delay_save(
+            lambda: {
+                "data": {
+                    tank_id: reading.as_dict() for tank_id, reading in data.items()
+                },
+                "fetched": fetched.isoformat() if fetched else None,
+            },
+            STORAGE_SNAPSHOT_DELAY,
+        )
+
+    def _async_save_session(self) -> None:
+        """Schedule a save of the session cookies if they changed."""
+        cookies = self.api.export_cookies()
+        if cookies == self._saved_cookies:
+            return
+        self._saved_cookies = cookies
+        self._session_store.async_delay_save(
+            lambda: {"cookies": cookies}, STORAGE_SESSION_DELAY
+        )
+
+    async def _async_record_history(
+        self, data: dict[str, TankReading], fetched: datetime
+    ) -> bool:
+        """Add new readings to the history and append them to its file.
+
+        Returns:
+            True if the level of any tank jumped up, as after a delivery
+
+        """
+        recorded = refilled = False
+        for tank_id, reading in data.items():
+            history = self.history.tank(tank_id)
+            previous = history.last() if history else None
+            if not self.history.record(tank_id, fetched, reading):
+                continue
+            recorded = True
+            if tank_id not in self.usage:
+                self.usage[tank_id] = UsageEstimator()
+            point = history.last()
+            if self.usage[tank_id].add(point):
+                refilled = True
+                self._async_fire_refill(tank_id, reading, previous, point)
+        if recorded:
+            lines, replace = self.history.take_pending()
+            await self.hass.async_add_executor_job(self.history.write, lines, replace)
+        self._async_update_forecasts(data)
+        return refilled
+
+    def _async_fire_refill(
+        self,
+        tank_id: str,
+        reading: TankReading,
+        previous: HistoryPoint | None,
+        point: HistoryPoint,
+    ) -> None:
+        """Fire a delivery event for a jump in the level of a tank."""
+        gallons = None
+        if (
+            previous is not None
+            and previous.gallons is not None
+            and point.gallons is not None
+        ):
+            gallons = round(point.gallons - previous.gallons, 1)
+        _LOGGER.debug("Tank %s was refilled with about %s gallons", tank_id, gallons)
+        self.hass.bus.async_fire(
+            EVENT_DELIVERY,
+            {
+                "entry_id": self.entry.entry_id,
+                "tank_id": tank_id,
+                "source": DELIVERY_SOURCE_LEVEL,
+                "delivery_date": dt_util.as_local(
+                    dt_util.utc_from_timestamp(point.timestamp)
+                ).date().isoformat(),
+                "gallons": gallons,
+                "price": reading.current_price,
+                "amount": None,
+                "invoice": None,
+            },
+        )
+
+    def _async_start_delivery_sync(
+        self, data: dict[str, TankReading], refilled: bool
+    ) -> None:
+        """Sync the delivery history in the background if it may have changed.
+
+        The backfill can fetch many pages, so neither the refresh nor the
+        setup of the entry waits for it.
+        """
+        if (
+            self._deliveries_task is not None and not self._deliveries_task.done()
+        ) or not self.deliveries.needs_sync(data, refilled):
+            return
+        self._deliveries_task = self.entry.async_create_background_task(
+            self.hass,
+            self.async_sync_deliveries(data, refilled),
+            f"{DOMAIN} {self.entry.entry_id} delivery sync",
+        )
 
-    async def _async_update_data(self) -> dict[str, Any]:
+    async def async_sync_deliveries(
+        self,
+        data: dict[str, TankReading],
+        refilled: bool,
+        ignore_backoff: bool = False,
+    ) -> None:
+        """Sync the delivery history if it may have changed.
+
+        The first sync backfills the history without firing events; later
+        ones fire a delivery event for each new delivery. After a failed
+        sync polls back off before trying again, unless the backoff is
+        ignored.
+        """
+        async with self._deliveries_lock:
+            if not self.deliveries.needs_sync(data, refilled, ignore_backoff):
+                return
+            backfill = self.deliveries.cursor is None
+            try:
+                new = await self.deliveries.async_sync(
+                    self._async_fetch_delivery_page, data
+                )
+            except MyFuelPortalAPIError as err:
+                backoff = self.deliveries.record_failure()
+                _LOGGER.warning(
+                    "Could not sync the delivery history, trying again in %d "
+                    "minutes: %s",
+                    backoff // 60,
+                    err,
+                )
+                return
+        self._deliveries_store.async_delay_save(
+            self.deliveries.as_dict, STORAGE_DELIVERIES_DELAY
+        )
+        if backfill:
+            _LOGGER.debug("Backfilled %d deliveries", len(new))
+            return
+        for delivery in new:
+            self._async_fire_delivery(delivery)
+
+    async def _async_fetch_delivery_page(self, page: int) -> DeliveryPage:
+        """Fetch a delivery history page in a portal request slot.
+
+        Each page takes its own slot, so a backfill doesn't hold one while
+        the other accounts wait.
+        """
+        async with self.fleet.slot(self.last_success_time):
+            return await self.api.async_get_delivery_page(page)
+
+    def _async_fire_delivery(self, delivery: Delivery) -> None:
+        """Fire a delivery event for a delivery from the delivery history."""
+        self.hass.bus.async_fire(
+            EVENT_DELIVERY,
+            {
+                "entry_id": self.entry.entry_id,
+                "tank_id": None,
+                "source": DELIVERY_SOURCE_PORTAL,
+                **delivery.as_dict(),
+            },
+        )
+
+    def _async_update_forecasts(self, data: dict[str, TankReading]) -> None:
+        """Update the consumption forecast of every tank."""
+        self.forecasts = {
+            tank_id: (
+                self.usage[tank_id].forecast(reading, self.reserve_level)
+                if tank_id in self.usage
+                else None
+            )
+            for tank_id, reading in data.items()
+        }
+
+    def _async_schedule_next_poll(self, data: dict[str, TankReading]) -> None:
+        """Learn from a successful poll and plan the next one."""
+        now = dt_util.now()
+        self.schedule.observe(now, _reading_key(data))
+        # Shift before clamping, so accounts never poll out of the allowed range
+        interval = self.fleet.jitter(self.schedule.next_interval(now))
+        self.update_interval = self.schedule.clamp(interval)
+        _LOGGER.debug("Next poll in %s", self.update_interval)
+        self._schedule_store.async_delay_save(
+            self.schedule.as_dict, STORAGE_SCHEDULE_DELAY
+        )
+
+    async def _async_update_data(self) -> dict[str, TankReading]:
         """Fetch data from API endpoint.
 
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
+        metrics = self.api.metrics
+        start = time.perf_counter()
+        try:
+            # Wait for a portal request slot shared with the other accounts
+            async with self.fleet.slot(self.last_success_time):
+                metrics.record(PHASE_FLEET_WAIT, time.perf_counter() - start)
+                data = await self._async_fetch_data()
+        finally:
+            metrics.record(PHASE_REFRESH, time.perf_counter() - start)
+            # Listeners are not called when the data is unchanged, so the
+            # diagnostic sensors are told separately
+            async_dispatcher_send(
+                self.hass, SIGNAL_METRICS_UPDATED.format(self.entry.entry_id)
+            )
+        self.last_success_time = time.monotonic()
+        self.data_fetched = dt_util.utcnow()
+        if self.from_snapshot:
+            self.from_snapshot = False
+            # Listeners are not called when the data equals the snapshot, yet
+            # the sensors must drop from_snapshot and show the new fetch time
+            if self.last_update_success and data == self.data:
+                self.async_update_listeners()
+        self._async_save_snapshot(data)
+        refilled = await self._async_record_history(data, self.data_fetched)
+        self._async_start_delivery_sync(data, refilled)
+        self._async_schedule_next_poll(data)
+        return data
+
+    async def _async_fetch_data(self) -> dict[str, TankReading]:
+        """Fetch tank data, logging in again once if the session expired."""
         try:
             # Fetch tank data from the API
             data = await self.api.async_get_tank_data()
+            self._async_save_session()
             return data
 
         except AuthenticationError as err:
             # Try to re-authenticate once if session expired
             _LOGGER.warning("Session expired, attempting to re-authenticate")
+            self.api.metrics.increment(COUNTER_REAUTHS)
             try:
                 await self.api.async_login()
                 data = await self.api.async_get_tank_data()
+                self._async_save_session()
                 return data
             except Exception as reauth_err:
                 raise UpdateFailed(
@@ -65,3 +405,38 @@ class MyCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         except Exception as err:
             raise UpdateFailed(f"Unexpected error: {err}") from err
+
+
+def _reading_key(data: dict[str, TankReading]) -> str | None:
+    """Return a value that changes when the reading of any tank changes."""
+    readings = [
+        f"{tank_id}={reading.reading_date.isoformat()}"
+        for tank_id, reading in data.items()
+        if reading.reading_date is not None
+    ]
+    return ",".join(readings) or None
+
+
+def session_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the session cookies of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.session")
+
+
+def schedule_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the learned polling schedule of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.schedule")
+
+
+def snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the last good tank data of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+def deliveries_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store holding the synced delivery history of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.deliveries")
+
+
+def history_path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the path of the reading history file of a config entry."""
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.history")
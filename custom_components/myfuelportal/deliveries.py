@@ -0,0 +1,205 @@
+"""Delivery history sync for MyFuelPortal."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from .models import Delivery, TankReading
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from .parser import DeliveryPage
+
+    # Fetches one page of the delivery history by number
+    PageFetcher = Callable[[int], Awaitable[DeliveryPage]]
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pages fetched at once, and at most, when the history is first synced
+BACKFILL_CONCURRENCY = 3
+MAX_BACKFILL_PAGES = 24
+# Deliveries kept; the newest are kept when there are more
+MAX_DELIVERIES = 500
+# Seconds before a failed sync is tried again, doubling with each failure
+RETRY_BACKOFF = 900
+MAX_RETRY_BACKOFF = 86400
+
+
+class DeliveryLog:
+    """Deliveries synced from the portal, oldest first.
+
+    The newest synced delivery date is the cursor of the sync: later syncs
+    read the history, which lists the newest deliveries first, only until
+    they reach it. The first sync backfills the history, fetching a bounded
+    number of pages a few at a time. A sync is only needed when the Tank
+    page shows a new last delivery date or a refill was seen in the tank
+    level, so polls don't download the history again. After a failed sync
+    polls wait for a backoff, doubling with each failure, before trying
+    again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        self.deliveries: list[Delivery] = []
+        self.cursor: date | None = None
+        # Newest last delivery date of the Tank page at the last sync
+        self.synced_for: date | None = None
+        self._keys: set[tuple[str, str, float | None]] = set()
+        # Failed syncs in a row, and the monotonic time of the next try
+        self.failures = 0
+        self.retry_at: float | None = None
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the log saved with as_dict."""
+        self.deliveries = [Delivery.from_dict(item) for item in data["deliveries"]]
+        self._keys = {delivery.key for delivery in self.deliveries}
+        self.cursor = _date(data.get("cursor"))
+        self.synced_for = _date(data.get("synced_for"))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the log as JSON serializable data."""
+        return {
+            "deliveries": [delivery.as_dict() for delivery in self.deliveries],
+            "cursor": self.cursor.isoformat() if self.cursor else None,
+            "synced_for": self.synced_for.isoformat() if self.synced_for else None,
+        }
+
+    def needs_sync(
+        self,
+        data: dict[str, TankReading],
+        refilled: bool,
+        ignore_backoff: bool = False,
+    ) -> bool:
+        """Return True if the delivery history may have new deliveries.
+
+        While backing off after a failed sync this is False, unless the
+        backoff is ignored.
+        """
+        if (
+            not ignore_backoff
+            and self.retry_at is not None
+            and time.monotonic() < self.retry_at
+        ):
+            return False
+        return (
+            self.cursor is None
+            or refilled
+            or _last_delivery_date(data) not in (None, self.synced_for)
+        )
+
+    def record_failure(self) -> float:
+        """Back off after a failed sync.
+
+        Returns:
+            The seconds until polls try to sync again
+
+        """
+        backoff = min(RETRY_BACKOFF * 2**self.failures, MAX_RETRY_BACKOFF)
+        self.failures += 1
+        self.retry_at = time.monotonic() + backoff
+        return backoff
+
+    async def async_sync(
+        self, fetch_page: PageFetcher, data: dict[str, TankReading]
+    ) -> list[Delivery]:
+        """Fetch the deliveries newer than the cursor.
+
+        Returns:
+            The deliveries not seen before, oldest first
+
+        Raises:
+            MyFuelPortalAPIError: If a page cannot be fetched; nothing is
+                added then, and the next sync starts over
+
+        """
+        if self.cursor is None:
+            pages = await self._async_backfill(fetch_page)
+        else:
+            pages = await self._async_fetch_new(fetch_page, self.cursor)
+        self.failures = 0
+        self.retry_at = None
+
+        new = []
+        for delivery in reversed([item for page in pages for item in page]):
+            if delivery.key in self._keys:
+                continue
+            self._keys.add(delivery.key)
+            new.append(delivery)
+        if new:
+            self.deliveries.extend(new)
+            self.deliveries.sort(key=lambda delivery: delivery.delivery_date)
+            if len(self.deliveries) > MAX_DELIVERIES:
+                del self.deliveries[:-MAX_DELIVERIES]
+                self._keys = {delivery.key for delivery in self.deliveries}
+        if self.deliveries:
+            self.cursor = self.deliveries[-1].delivery_date
+        else:
+            # An empty history is synced too; wait for a delivery date
+            self.cursor = date.min
+        self.synced_for = _last_delivery_date(data)
+        _LOGGER.debug(
+            "Synced %d new deliveries, cursor is now %s", len(new), self.cursor
+        )
+        return new
+
+    @staticmethod
+    async def _async_backfill(fetch_page: PageFetcher) -> list[list[Delivery]]:
+        """Fetch the history pages, newest first."""
+        first = await fetch_page(1)
+        last_page = min(first.last_page, MAX_BACKFILL_PAGES)
+        if first.last_page > last_page:
+            _LOGGER.debug(
+                "Delivery history has %d pages, backfilling the first %d",
+                first.last_page,
+                last_page,
+            )
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+        async def _async_fetch(page: int) -> list[Delivery]:
+            async with semaphore:
+                return (await fetch_page(page)).deliveries
+
+        rest = await asyncio.gather(
+            *(_async_fetch(page) for page in range(2, last_page + 1))
+        )
+        return [first.deliveries, *rest]
+
+    @staticmethod
+    async def _async_fetch_new(
+        fetch_page: PageFetcher, cursor: date
+    ) -> list[list[Delivery]]:
+        """Fetch history pages, newest first, until one reaches the cursor."""
+        pages = []
+        page = 1
+        while True:
+            result = await fetch_page(page)
+            pages.append(result.deliveries)
+            if (
+                not result.deliveries
+                or result.deliveries[-1].delivery_date <= cursor
+                or page >= min(result.last_page, MAX_BACKFILL_PAGES)
+            ):
+                return pages
+            page += 1
+
+
+def _date(value: str | None) -> date | None:
+    """Return a date saved in ISO format, if any."""
+    return date.fromisoformat(value) if value else None
+
+
+def _last_delivery_date(data: dict[str, TankReading]) -> date | None:
+    """Return the newest last delivery date of any tank."""
+    return max(
+        (
+            reading.last_delivery_date
+            for reading in data.values()
+            if reading.last_delivery_date is not None
+        ),
+        default=None,
+    )
@@ -0,0 +1,56 @@
+"""Diagnostics support for MyFuelPortal."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .coordinator import MyCoordinator
+
+if TYPE_CHECKING:
+    from homeassistant.config_entries import ConfigEntry
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: MyCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "fleet": {
+                "max_concurrent": coordinator.fleet.max_concurrent,
+                "active": coordinator.fleet.active,
+                "waiting": coordinator.fleet.waiting,
+            },
+        },
+        "portal": coordinator.api.guard.as_dict(),
+        "performance": {
+            **coordinator.api.metrics.as_dict(),
+            "parse_time_s": round(coordinator.api.parse_time, 3),
+            "loop_blocked_time_s": round(coordinator.api.loop_blocked_time, 3),
+        },
+        "deliveries": {
+            "count": len(coordinator.deliveries.deliveries),
+            "cursor": (
+                coordinator.deliveries.cursor.isoformat()
+                if coordinator.deliveries.cursor
+                else None
+            ),
+        },
+        "data": {
+            tank_id: reading.as_dict()
+            for tank_id, reading in (coordinator.data or {}).items()
+        },
+    }
@@ -0,0 +1,23 @@
+"""Exceptions for the MyFuelPortal API client."""
+
+from __future__ import annotations
+
+
+class MyFuelPortalAPIError(Exception):
+    """Base exception for MyFuelPortal API errors."""
+
+
+class AuthenticationError(MyFuelPortalAPIError):
+    """Authentication failed."""
+
+
+class ConnectionError(MyFuelPortalAPIError):
+    """Connection to MyFuelPortal failed."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Requests to MyFuelPortal are paused after repeated failures."""
+
+
+class ParsingError(MyFuelPortalAPIError):
+    """Failed to parse data from HTML."""
@@ -0,0 +1,285 @@
+"""Local history of tank readings for MyFuelPortal."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from datetime import datetime
+import json
+import logging
+import math
+import os
+from typing import NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+from .models import TankReading
+
+_LOGGER = logging.getLogger(__name__)
+
+# Readings kept per tank; the portal publishes about one reading a day
+HISTORY_CAPACITY = 2048
+# Rewrite the file once it holds this many times the kept readings
+_COMPACT_FACTOR = 2
+
+
+class HistoryPoint(NamedTuple):
+    """One recorded reading of a tank."""
+
+    timestamp: float  # seconds since the epoch
+    level: float
+    gallons: float | None
+    price: float | None
+
+
+def _value(value: float | None) -> float:
+    """Return a value for a float array, NaN when missing."""
+    return math.nan if value is None else value
+
+
+def _optional(value: float) -> float | None:
+    """Return a value read from a float array, None when missing."""
+    return None if math.isnan(value) else value
+
+
+class TankHistory:
+    """Ring buffer of the readings of one tank, oldest first.
+
+    Each field is kept in its own array of doubles, with NaN for missing
+    values, so a reading costs 32 bytes. Appends are O(1); once the buffer
+    is full the oldest reading is overwritten. Timestamps only increase,
+    so time windows are found by binary search.
+    """
+
+    __slots__ = ("capacity", "_times", "_levels", "_gallons", "_prices", "_start")
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize an empty history."""
+        self.capacity = capacity
+        self._times = array("d")
+        self._levels = array("d")
+        self._gallons = array("d")
+        self._prices = array("d")
+        # Physical index of the oldest reading once the buffer is full
+        self._start = 0
+
+    def __len__(self) -> int:
+        """Return the number of readings."""
+        return len(self._times)
+
+    def _physical(self, index: int) -> int:
+        """Return the array index of the index-th oldest reading."""
+        return (self._start + index) % self.capacity
+
+    def _point(self, index: int) -> HistoryPoint:
+        """Return the index-th oldest reading."""
+        physical = self._physical(index)
+        return HistoryPoint(
+            self._times[physical],
+            self._levels[physical],
+            _optional(self._gallons[physical]),
+            _optional(self._prices[physical]),
+        )
+
+    def append(
+        self,
+        timestamp: float,
+        level: float,
+        gallons: float | None,
+        price: float | None,
+    ) -> bool:
+        """Add a reading and return True, unless it is not newer than the last."""
+        if self._times and timestamp <= self.last().timestamp:
+            return False
+        if len(self._times) < self.capacity:
+            self._times.append(timestamp)
+            self._levels.append(level)
+            self._gallons.append(_value(gallons))
+            self._prices.append(_value(price))
+            return True
+        physical = self._start
+        self._times[physical] = timestamp
+        self._levels[physical] = level
+        self._gallons[physical] = _value(gallons)
+        self._prices[physical] = _value(price)
+        self._start = (self._start + 1) % self.capacity
+        return True
+
+    def last(self) -> HistoryPoint:
+        """Return the newest reading.
+
+        Raises:
+            IndexError: If the history is empty
+
+        """
+        if not self._times:
+            raise IndexError("History is empty")
+        return self._point(len(self._times) - 1)
+
+    def _bisect(self, timestamp: float) -> int:
+        """Return the index of the oldest reading at or after a time."""
+        return bisect_left(
+            range(len(self._times)),
+            timestamp,
+            key=lambda index: self._times[self._physical(index)],
+        )
+
+    def window(
+        self, start: float | None = None, end: float | None = None
+    ) -> list[HistoryPoint]:
+        """Return the readings with start <= timestamp < end, oldest first."""
+        first = 0 if start is None else self._bisect(start)
+        last = len(self._times) if end is None else self._bisect(end)
+        return [self._point(index) for index in range(first, last)]
+
+    def __iter__(self) -> Iterator[HistoryPoint]:
+        """Iterate over all readings, oldest first."""
+        return iter(self.window())
+
+
+class ReadingHistory:
+    """History of every tank of a config entry, kept in an append-only file.
+
+    Each line of the file is a JSON array of tank id, timestamp, level,
+    gallons and price. Only new lines are appended; when the file holds
+    far more readings than are kept, it is rewritten with the kept ones.
+    File access is blocking and must run in the executor; the lines to
+    write are taken in the event loop first, where readings are recorded.
+    """
+
+    def __init__(self, path: str, capacity: int = HISTORY_CAPACITY) -> None:
+        """Initialize the history stored in a file."""
+        self.path = path
+        self.capacity = capacity
+        self.tanks: dict[str, TankHistory] = {}
+        self._pending: list[str] = []
+        self._lines = 0
+        # The file ends in a partial line that the next append must not extend
+        self._torn = False
+
+    def tank(self, tank_id: str) -> TankHistory:
+        """Return the history of a tank, creating it if needed."""
+        if tank_id not in self.tanks:
+            self.tanks[tank_id] = TankHistory(self.capacity)
+        return self.tanks[tank_id]
+
+    def record(self, tank_id: str, fetched: datetime, reading: TankReading) -> bool:
+        """Record a reading if it is new and return True if it was.
+
+        A reading is new when its values differ from the last recorded
+        ones, or when it was taken on a later day than the last one was
+        recorded.
+        """
+        history = self.tank(tank_id)
+        if history:
+            last = history.last()
+            unchanged = (last.level, last.gallons, last.price) == (
+                reading.tank_level_percent,
+                reading.gallons_remaining,
+                reading.current_price,
+            )
+            recorded_on = dt_util.as_local(
+                dt_util.utc_from_timestamp(last.timestamp)
+            ).date()
+            if unchanged and (
+                reading.reading_date is None or reading.reading_date <= recorded_on
+            ):
+                return False
+        timestamp = fetched.timestamp()
+        if not history.append(
+            timestamp,
+            reading.tank_level_percent,
+            reading.gallons_remaining,
+            reading.current_price,
+        ):
+            return False
+        self._pending.append(
+            json.dumps(
+                [
+                    tank_id,
+                    timestamp,
+                    reading.tank_level_percent,
+                    reading.gallons_remaining,
+                    reading.current_price,
+                ]
+            )
+        )
+        return True
+
+    def load(self) -> None:
+        """Read the history file, skipping lines that cannot be parsed."""
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                for line in file:
+                    self._lines += 1
+                    self._torn = not line.endswith("\n")
+                    try:
+                        tank_id, timestamp, level, gallons, price = json.loads(line)
+                        self.tank(tank_id).append(timestamp, level, gallons, price)
+                    except (ValueError, TypeError):
+                        # A write cut short by a crash leaves a partial line
+                        _LOGGER.debug("Skipping bad history line: %r", line)
+        except FileNotFoundError:
+            return
+        _LOGGER.debug(
+            "Loaded %d readings of %d tanks from %s",
+            sum(len(history) for history in self.tanks.values()),
+            len(self.tanks),
+            self.path,
+        )
+
+    def take_pending(self) -> tuple[list[str], bool]:
+        """Return the lines to write and whether they replace the file.
+
+        Hands over the readings recorded since the last call, or every kept
+        reading once the file holds far more readings than are kept. Runs
+        in the event loop, so the lines can be written in the executor
+        while new readings are recorded.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return pending, False
+        kept = sum(len(history) for history in self.tanks.values())
+        if self._lines + len(pending) > _COMPACT_FACTOR * max(kept, self.capacity):
+            lines = [
+                json.dumps(
+                    [tank_id, point.timestamp, point.level, point.gallons, point.price]
+                )
+                for tank_id, history in self.tanks.items()
+                for point in history
+            ]
+            return lines, True
+        return pending, False
+
+    def write(self, lines: list[str], replace: bool) -> None:
+        """Append lines from take_pending to the file, or replace it with them."""
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if replace:
+            self._compact(lines)
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            if self._torn:
+                file.write("\n")
+                self._torn = False
+            file.write("".join(f"{line}\n" for line in lines))
+        self._lines += len(lines)
+
+    def _compact(self, lines: list[str]) -> None:
+        """Rewrite the file with only the readings that are kept."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write("".join(f"{line}\n" for line in lines))
+        os.replace(temp_path, self.path)
+        self._torn = False
+        _LOGGER.debug("Compacted %s to %d readings", self.path, len(lines))
+        self._lines = len(lines)
+
+    def remove(self) -> None:
+        """Delete the history file."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,97 @@
+"""Performance counters for MyFuelPortal."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+import math
+import time
+from typing import Any
+
+# Samples of each phase kept for the percentiles
+METRICS_WINDOW = 100
+PERCENTILES = (50, 90, 99)
+
+# Phases timed by the API client and coordinator
+PHASE_REFRESH = "refresh"
+PHASE_FLEET_WAIT = "fleet_wait"
+PHASE_LOGIN_GET = "login_get"
+PHASE_CSRF_PARSE = "csrf_parse"
+PHASE_LOGIN_POST = "login_post"
+PHASE_TANK_FETCH = "tank_fetch"
+PHASE_TANK_PARSE = "tank_parse"
+PHASE_DELIVERY_FETCH = "delivery_fetch"
+PHASE_DELIVERY_PARSE = "delivery_parse"
+
+# Counters
+COUNTER_BYTES_RECEIVED = "bytes_received"
+COUNTER_LOGINS = "logins"
+COUNTER_REAUTHS = "reauths"
+COUNTER_NOT_MODIFIED = "not_modified"
+COUNTER_UNCHANGED_PAGES = "unchanged_pages"
+COUNTER_PARSE_FALLBACKS = "parse_fallbacks"
+
+
+class RefreshMetrics:
+    """Rolling timings of each refresh phase, and running counters.
+
+    Only the last METRICS_WINDOW samples of each phase are kept. Phases and
+    counters are created on first use, so parser extractors and fallbacks
+    show up without being declared here. All methods must be called from
+    the event loop.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize empty metrics."""
+        self.window = window
+        self.timings: dict[str, deque[float]] = {}
+        # Time spent in each phase since startup, all samples included
+        self.totals: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Add a duration sample of a phase."""
+        if phase not in self.timings:
+            self.timings[phase] = deque(maxlen=self.window)
+        self.timings[phase].append(seconds)
+        self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Add to a counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def timed(self, phase: str) -> Iterator[None]:
+        """Record how long the block takes, also if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def last(self, phase: str) -> float | None:
+        """Return the last duration of a phase in seconds, if any."""
+        samples = self.timings.get(phase)
+        return samples[-1] if samples else None
+
+    def summary(self, phase: str) -> dict[str, Any]:
+        """Return the sample count, last value and percentiles of a phase in ms."""
+        samples = sorted(self.timings.get(phase, ()))
+        summary: dict[str, Any] = {"count": len(samples)}
+        if not samples:
+            return summary
+        summary["last_ms"] = round(self.timings[phase][-1] * 1000, 2)
+        for percentile in PERCENTILES:
+            # Nearest rank
+            rank = max(1, math.ceil(percentile / 100 * len(samples)))
+            summary[f"p{percentile}_ms"] = round(samples[rank - 1] * 1000, 2)
+        return summary
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every phase summary and counter."""
+        return {
+            "window": self.window,
+            "timings": {phase: self.summary(phase) for phase in sorted(self.timings)},
+            "counters": dict(sorted(self.counters.items())),
+        }
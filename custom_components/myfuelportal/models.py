@@ -0,0 +1,170 @@
+"""Data models for MyFuelPortal."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from .patterns import PATTERNS
+
+_DATE_PATTERN = PATTERNS.register(
+    "portal_date", r"^(\d{1,2})[/-](\d{1,2})[/-](\d{2}|\d{4})$"
+)
+
+
+def parse_date(value: str | None) -> date | None:
+    """Parse a portal date like "01/05/2024" or "1-5-24".
+
+    Returns:
+        The date, or None if the value is missing or not a valid date
+
+    """
+    if not value:
+        return None
+    match = _DATE_PATTERN.match(value.strip())
+    if match is None:
+        return None
+    month, day, year = (int(part) for part in match.groups())
+    if year < 100:
+        year += 2000
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+class TankReading:
+    """The values of one tank, as read from the Tank page.
+
+    Values the page does not show are None.
+    """
+
+    __slots__ = (
+        "tank_level_percent",
+        "gallons_remaining",
+        "tank_capacity",
+        "fuel_type",
+        "last_delivery_date",
+        "reading_date",
+        "current_price",
+    )
+
+    def __init__(
+        self,
+        tank_level_percent: float,
+        gallons_remaining: float | None = None,
+        tank_capacity: float | None = None,
+        fuel_type: str | None = None,
+        last_delivery_date: date | None = None,
+        reading_date: date | None = None,
+        current_price: float | None = None,
+    ) -> None:
+        """Initialize the reading."""
+        self.tank_level_percent = tank_level_percent
+        self.gallons_remaining = gallons_remaining
+        self.tank_capacity = tank_capacity
+        self.fuel_type = fuel_type
+        self.last_delivery_date = last_delivery_date
+        self.reading_date = reading_date
+        self.current_price = current_price
+
+    def _values(self) -> tuple[Any, ...]:
+        """Return the values in slot order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the other reading has the same values."""
+        if not isinstance(other, TankReading):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the reading with its values."""
+        values = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())
+        )
+        return f"TankReading({values})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the reading as JSON serializable data."""
+        data = dict(zip(self.__slots__, self._values()))
+        for name in ("last_delivery_date", "reading_date"):
+            if data[name] is not None:
+                data[name] = data[name].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TankReading:
+        """Create a reading from data returned by as_dict."""
+        values = {name: data.get(name) for name in cls.__slots__}
+        for name in ("last_delivery_date", "reading_date"):
+            if values[name] is not None:
+                try:
+                    values[name] = date.fromisoformat(values[name])
+                except ValueError:
+                    # Saved before dates were parsed, in the portal's format
+                    values[name] = parse_date(values[name])
+        return cls(**values)
+
+
+class Delivery:
+    """One delivery from the portal's delivery history.
+
+    Values the history does not show are None.
+    """
+
+    __slots__ = ("delivery_date", "gallons", "price", "amount", "invoice")
+
+    def __init__(
+        self,
+        delivery_date: date,
+        gallons: float | None = None,
+        price: float | None = None,
+        amount: float | None = None,
+        invoice: str | None = None,
+    ) -> None:
+        """Initialize the delivery."""
+        self.delivery_date = delivery_date
+        self.gallons = gallons
+        self.price = price
+        self.amount = amount
+        self.invoice = invoice
+
+    @property
+    def key(self) -> tuple[str, str, float | None]:
+        """Return what identifies the delivery across syncs."""
+        return (self.delivery_date.isoformat(), self.invoice or "", self.gallons)
+
+    def _values(self) -> tuple[Any, ...]:
+        """Return the values in slot order."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if the other delivery has the same values."""
+        if not isinstance(other, Delivery):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Return the delivery with its values."""
+        values = ", ".join(
+            f"{name}={value!r}" for name, value in zip(self.__slots__, self._values())
+        )
+        return f"Delivery({values})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the delivery as JSON serializable data."""
+        data = dict(zip(self.__slots__, self._values()))
+        data["delivery_date"] = self.delivery_date.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Delivery:
+        """Create a delivery from data returned by as_dict."""
+        values = {name: data.get(name) for name in cls.__slots__}
+        values["delivery_date"] = date.fromisoformat(values["delivery_date"])
+        return cls(**values)
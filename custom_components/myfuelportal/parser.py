@@ -0,0 +1,1157 @@
+"""HTML extraction engine for MyFuelPortal pages.
+
+The portal pages are walked exactly once. While walking, every element and
+string is handed to a page visitor which records the candidates each field
+extractor is interested in; the fields are then resolved from that flat index
+without touching the tree again.
+
+Two tree backends are supported. ``html.parser`` builds the tree with
+BeautifulSoup and is the default, matching the results of the original
+parser exactly. ``lxml`` builds the tree considerably faster and can be
+selected when it is installed; it gives the same results on well-formed
+pages, but repairs malformed markup (such as a ``<div>`` inside a ``<p>``)
+differently.
+
+Both backends are imported, and the patterns of the extractors compiled,
+when the first page is parsed, so loading the integration doesn't pay for
+them.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable
+import functools
+import hashlib
+import logging
+import re
+import time
+from typing import Any, NamedTuple, TypeVar
+
+from .exceptions import ParsingError
+from .models import Delivery, TankReading, parse_date
+from .patterns import PATTERNS
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+BACKEND_HTML_PARSER = "html.parser"
+BACKEND_LXML = "lxml"
+BACKEND_AUTO = "auto"
+DEFAULT_BACKEND = BACKEND_HTML_PARSER
+
+# String kinds, mirroring the NavigableString subclasses BeautifulSoup uses.
+# Only strings of the kind an element is "interested" in count towards its text.
+_TEXT = 0
+_SCRIPT = 1
+_STYLE = 2
+_TEMPLATE = 3
+_RUBY_TEXT = 4
+_RUBY_PARENTHESIS = 5
+_OTHER = 6  # Comments, doctypes, declarations and processing instructions
+
+# Tags whose strings are stored with a dedicated kind
+_CONTAINER_KINDS = {
+    "script": _SCRIPT,
+    "style": _STYLE,
+    "template": _TEMPLATE,
+    "rt": _RUBY_TEXT,
+    "rp": _RUBY_PARENTHESIS,
+}
+
+_ROOT_NAME = "[document]"
+
+CSRF_TOKEN_NAME = "__RequestVerificationToken"
+
+# Change detection
+_BODY_PATTERN = PATTERNS.register("body", r"<body\b", re.IGNORECASE)
+_CSRF_INPUT_PATTERN = PATTERNS.register(
+    "csrf_input", r"<input\b[^>]*" + CSRF_TOKEN_NAME + r"[^>]*>", re.IGNORECASE
+)
+
+# Field patterns
+_GALLONS_PHRASE = "gallons in tank"
+_GALLONS_PATTERN = PATTERNS.register(
+    "gallons", r"(\d+\.?\d*)\s*gallons", re.IGNORECASE
+)
+_CAPACITY_PATTERN = PATTERNS.register(
+    "capacity",
+    r"(\d+\.?\d*)\s*(Gal\.?|Gallon)(?:\s*\|\s*|\s+)(\w+)",
+    re.IGNORECASE,
+)
+_SIMPLE_CAPACITY_PATTERN = PATTERNS.register(
+    "simple_capacity", r"(\d+\.?\d*)\s*(Gal\.?|Gallon)", re.IGNORECASE
+)
+_DELIVERY_PATTERN = PATTERNS.register("delivery", r"last\s+delivery", re.IGNORECASE)
+_READING_PATTERN = PATTERNS.register(
+    "reading", r"(reading\s+date|last\s+reading|tank\s+reading)", re.IGNORECASE
+)
+_DATE_PATTERN = PATTERNS.register(
+    "date_in_text", r"(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})"
+)
+_PRICE_PATTERN = PATTERNS.register(
+    "price", r"\$\s*(\d+(?:\.\d+)?)", re.IGNORECASE
+)
+_PRICE_FULL_TEXT_PATTERN = PATTERNS.register(
+    "price_full_text",
+    r"\$\s*(\d+(?:\.\d+)?)\s*(?:/\s*gal|per\s*gal)",
+    re.IGNORECASE,
+)
+_PRICE_KEYWORDS = ("price", "current", "per", "gal", "/")
+
+# Delivery history columns, matched against the lowercased header text in
+# this order, and the links to its other pages
+_DELIVERY_COLUMNS = (
+    ("delivery_date", ("date",)),
+    ("invoice", ("invoice", "ticket")),
+    ("price", ("price", "/gal", "per gal")),
+    ("gallons", ("gallons", "quantity", "qty", "volume")),
+    ("amount", ("amount", "total", "cost")),
+)
+_NUMBER_PATTERN = PATTERNS.register("number", r"-?\d[\d,]*(?:\.\d+)?|-?\.\d+")
+_PAGE_LINK_PATTERN = PATTERNS.register(
+    "page_link", r"[?&]page=(\d+)", re.IGNORECASE
+)
+
+# Streamed Tank pages are scanned tag by tag for the end of the body.
+# Groups: end of a comment, closing slash, tag name and attributes
+_TAG_PATTERN = PATTERNS.register(
+    "tag", r"<!--(?:.*?(-->))?|<(/?)([A-Za-z][A-Za-z0-9:-]*)([^<>]*)>", re.DOTALL
+)
+_RAW_TEXT_ENDS = {
+    "script": PATTERNS.register("script_end", r"</script\s*>", re.IGNORECASE),
+    "style": PATTERNS.register("style_end", r"</style\s*>", re.IGNORECASE),
+}
+
+
+class _Document:
+    """Flat index of a page built during a single traversal.
+
+    Elements and strings are numbered in document order. Each element
+    records the range of string indices and element indices it contains,
+    so the text or descendants of any element can be found without walking
+    its subtree again.
+    """
+
+    __slots__ = (
+        "visitor",
+        "names",
+        "attrs",
+        "starts",
+        "ends",
+        "strings",
+        "kinds",
+        "parents",
+        "element_parents",
+        "element_ends",
+        "_open",
+        "_text",
+        "_offsets",
+    )
+
+    def __init__(self, visitor: Any) -> None:
+        """Initialize an empty document feeding the given visitor."""
+        self.visitor = visitor
+        self.names: list[str] = []
+        self.attrs: list[dict[str, Any]] = []
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.strings: list[str] = []
+        self.kinds: list[int] = []
+        self.parents: list[int] = []
+        self.element_parents: list[int] = []
+        self.element_ends: list[int] = []
+        self._open: list[int] = []
+        self._text: str | None = None
+        self._offsets: list[int] = []
+
+    def start(self, name: str, attrs: dict[str, Any]) -> int:
+        """Open an element and dispatch it to the visitor."""
+        index = len(self.names)
+        self.names.append(name)
+        self.attrs.append(attrs)
+        self.starts.append(len(self.strings))
+        self.ends.append(len(self.strings))
+        self.element_parents.append(self._open[-1] if self._open else -1)
+        self.element_ends.append(index + 1)
+        self._open.append(index)
+        self.visitor.element(self, index)
+        return index
+
+    def end(self, index: int) -> None:
+        """Close an element once all of its descendants were added."""
+        self.ends[index] = len(self.strings)
+        self.element_ends[index] = len(self.names)
+        self._open.pop()
+
+    def text(self, value: str, kind: int, parent: int) -> None:
+        """Add a string and dispatch it to the visitor."""
+        index = len(self.strings)
+        self.strings.append(value)
+        self.kinds.append(kind)
+        self.parents.append(parent)
+        self.visitor.string(self, index)
+
+    @property
+    def stripped_text(self) -> str:
+        """Return every stripped text string of the page joined together."""
+        if self._text is None:
+            parts: list[str] = []
+            offsets = self._offsets
+            position = 0
+            for value, kind in zip(self.strings, self.kinds):
+                offsets.append(position)
+                if kind == _TEXT:
+                    value = value.strip()
+                    if value:
+                        parts.append(value)
+                        position += len(value)
+            offsets.append(position)
+            self._text = "".join(parts)
+        return self._text
+
+    def element_text(self, index: int) -> str:
+        """Return the text of an element, like ``get_text(strip=True)``."""
+        start = self.starts[index]
+        end = self.ends[index]
+        kind = _CONTAINER_KINDS.get(self.names[index], _TEXT)
+        if kind == _TEXT:
+            text = self.stripped_text
+            return text[self._offsets[start] : self._offsets[end]]
+        stripped = (
+            self.strings[position].strip()
+            for position in range(start, end)
+            if self.kinds[position] == kind
+        )
+        return "".join(value for value in stripped if value)
+
+    def full_text(self, start: int = 0, end: int | None = None) -> str:
+        """Return the unstripped text of a range of strings, like ``get_text()``."""
+        return "".join(
+            value
+            for value, kind in zip(self.strings[start:end], self.kinds[start:end])
+            if kind == _TEXT
+        )
+
+    def elements_containing(self, indices: list[int], phrase: str) -> list[int]:
+        """Return the elements whose text contains a phrase, ignoring case."""
+        text = self.stripped_text
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Lowercasing changed offsets, so compare each element directly
+            return [
+                index
+                for index in indices
+                if phrase in self.element_text(index).lower()
+            ]
+
+        hits = [match.start() for match in re.finditer(re.escape(phrase), lowered)]
+        if not hits:
+            return []
+
+        found = []
+        for index in indices:
+            start = self._offsets[self.starts[index]]
+            end = self._offsets[self.ends[index]]
+            position = bisect_left(hits, start)
+            if position < len(hits) and hits[position] + len(phrase) <= end:
+                found.append(index)
+        return found
+
+
+def _classes(value: Any) -> list[str]:
+    """Return the class list of an element from either backend."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return list(value)
+
+
+class _SoupTypes(NamedTuple):
+    """The BeautifulSoup classes the ``html.parser`` backend needs."""
+
+    beautiful_soup: Callable[..., Any]
+    tag: type
+    # BeautifulSoup string classes mapped onto string kinds
+    string_kinds: dict[type, int]
+
+
+@functools.cache
+def _soup_types() -> _SoupTypes:
+    """Import BeautifulSoup on first use.
+
+    Importing bs4 takes longer than importing the rest of the integration,
+    so it is left to the first page parsed rather than to Home Assistant
+    loading the integration.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from bs4 import BeautifulSoup
+
+    # pylint: disable-next=import-outside-toplevel
+    from bs4.element import (
+        CData,
+        NavigableString,
+        RubyParenthesisString,
+        RubyTextString,
+        Script,
+        Stylesheet,
+        Tag,
+        TemplateString,
+    )
+
+    return _SoupTypes(
+        BeautifulSoup,
+        Tag,
+        {
+            NavigableString: _TEXT,
+            CData: _TEXT,
+            Script: _SCRIPT,
+            Stylesheet: _STYLE,
+            TemplateString: _TEMPLATE,
+            RubyTextString: _RUBY_TEXT,
+            RubyParenthesisString: _RUBY_PARENTHESIS,
+        },
+    )
+
+
+def _walk_html_parser(html: str, document: _Document) -> None:
+    """Walk a BeautifulSoup ``html.parser`` tree once."""
+    beautiful_soup, tag, string_kinds = _soup_types()
+    soup = beautiful_soup(html, "html.parser")
+    root = document.start(_ROOT_NAME, {})
+    stack = [(iter(soup.contents), root)]
+    while stack:
+        children, parent = stack[-1]
+        for child in children:
+            if isinstance(child, tag):
+                index = document.start(child.name, child.attrs)
+                stack.append((iter(child.contents), index))
+                break
+            document.text(str(child), string_kinds.get(type(child), _OTHER), parent)
+        else:
+            stack.pop()
+            document.end(parent)
+
+
+def _walk_lxml(html: str, document: _Document) -> None:
+    """Walk an lxml tree once, mapping it onto the BeautifulSoup string model."""
+    # pylint: disable-next=import-outside-toplevel
+    from lxml import etree, html as lxml_html
+
+    try:
+        tree = lxml_html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        # Empty documents and encoding declarations are left to the
+        # reference backend; nothing was dispatched to the visitor yet
+        _walk_html_parser(html, document)
+        return
+
+    root = document.start(_ROOT_NAME, {})
+    # Comments outside the root element hang off it as siblings
+    for sibling in reversed(list(tree.itersiblings(preceding=True))):
+        document.text(sibling.text or "", _OTHER, root)
+
+    index = document.start(tree.tag, dict(tree.attrib))
+    kind = _CONTAINER_KINDS.get(tree.tag, _TEXT)
+    if tree.text:
+        document.text(tree.text, kind, index)
+
+    stack = [(tree, iter(tree), index, kind)]
+    while stack:
+        element, children, parent, kind = stack[-1]
+        for child in children:
+            if isinstance(child.tag, str):
+                index = document.start(child.tag, dict(child.attrib))
+                child_kind = _CONTAINER_KINDS.get(child.tag, kind)
+                if child.text:
+                    document.text(child.text, child_kind, index)
+                stack.append((child, iter(child), index, child_kind))
+                break
+            # Comments, processing instructions and entities
+            document.text(child.text or "", _OTHER, parent)
+            if child.tail:
+                document.text(child.tail, kind, parent)
+        else:
+            stack.pop()
+            document.end(parent)
+            if stack and element.tail:
+                document.text(element.tail, stack[-1][3], stack[-1][2])
+
+    for sibling in tree.itersiblings():
+        document.text(sibling.text or "", _OTHER, root)
+    document.end(root)
+
+
+_BACKENDS: dict[str, Callable[[str, _Document], None]] = {
+    BACKEND_HTML_PARSER: _walk_html_parser,
+    BACKEND_LXML: _walk_lxml,
+}
+
+
+def _lxml_available() -> bool:
+    """Return True if lxml can be imported."""
+    try:
+        import lxml.html  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Return the backend to use for a requested backend name.
+
+    ``None`` selects the reference backend, ``auto`` selects lxml when it is
+    installed.
+    """
+    if backend is None:
+        return DEFAULT_BACKEND
+    if backend == BACKEND_AUTO:
+        return BACKEND_LXML if _lxml_available() else BACKEND_HTML_PARSER
+    if backend not in _BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return backend
+
+
+def _parse(html: str, visitor: Any, backend: str | None) -> _Document:
+    """Build the flat document for a page with the selected backend."""
+    walk = _BACKENDS[resolve_backend(backend)]
+    document = _Document(visitor)
+    walk(html, document)
+    return document
+
+
+class _LoginPageVisitor:
+    """Collect the CSRF token input of the login page."""
+
+    __slots__ = ("token_input",)
+
+    def __init__(self) -> None:
+        """Initialize the visitor."""
+        self.token_input: int | None = None
+
+    def element(self, document: _Document, index: int) -> None:
+        """Remember the first token input."""
+        if (
+            self.token_input is None
+            and document.names[index] == "input"
+            and document.attrs[index].get("name") == CSRF_TOKEN_NAME
+        ):
+            self.token_input = index
+
+    def string(self, document: _Document, index: int) -> None:
+        """Ignore strings, the token lives in an attribute."""
+
+
+class ParseStats:
+    """Time spent in each extractor and fallbacks taken during parses.
+
+    Filled on the thread that parses, and read once the parse is done.
+    """
+
+    __slots__ = ("timings", "fallbacks")
+
+    def __init__(self) -> None:
+        """Initialize empty stats."""
+        self.timings: dict[str, float] = {}
+        self.fallbacks: dict[str, int] = {}
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add time spent in an extractor or stage."""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def fallback(self, name: str) -> None:
+        """Count a field that was only found through a fallback."""
+        self.fallbacks[name] = self.fallbacks.get(name, 0) + 1
+
+
+class _TankContainer(NamedTuple):
+    """The part of the page holding one tank.
+
+    Usually a single element; when the tanks of a page are runs of sibling
+    elements without a wrapper of their own, a run of siblings instead.
+    """
+
+    # Element that encloses the tank, where the search for its id stops
+    element: int
+    # Ranges of the element indices and of the string indices of the tank
+    element_start: int
+    element_end: int
+    start: int
+    end: int
+
+    @classmethod
+    def of(cls, document: _Document, element: int) -> _TankContainer:
+        """Return the container made of one element."""
+        return cls(
+            element,
+            element,
+            document.element_ends[element],
+            document.starts[element],
+            document.ends[element],
+        )
+
+
+def _children(document: _Document, parent: int) -> list[int]:
+    """Return the child elements of an element."""
+    children = []
+    child = parent + 1
+    while child < document.element_ends[parent]:
+        children.append(child)
+        child = document.element_ends[child]
+    return children
+
+
+def _signature(document: _Document, index: int) -> tuple[str, str]:
+    """Return the tag and classes of an element, to compare repeated markup."""
+    return document.names[index], " ".join(_classes(document.attrs[index].get("class")))
+
+
+class _TankPageVisitor:
+    """Collect the candidates of every Tank page field in one traversal."""
+
+    __slots__ = (
+        "stats",
+        "progress_bars",
+        "divs",
+        "capacity_strings",
+        "capacities",
+        "simple_capacity_strings",
+        "simple_capacities",
+        "delivery_strings",
+        "reading_strings",
+        "price_strings",
+    )
+
+    def __init__(self, stats: ParseStats | None = None) -> None:
+        """Initialize the visitor."""
+        self.stats = stats or ParseStats()
+        self.progress_bars: list[int] = []
+        self.divs: list[int] = []
+        self.capacity_strings: list[int] = []
+        self.capacities: list[tuple[float, str]] = []
+        self.simple_capacity_strings: list[int] = []
+        self.simple_capacities: list[float] = []
+        self.delivery_strings: list[int] = []
+        self.reading_strings: list[int] = []
+        self.price_strings: list[int] = []
+
+    def element(self, document: _Document, index: int) -> None:
+        """Record divs and tank level progress bars."""
+        if document.names[index] != "div":
+            return
+        self.divs.append(index)
+        attrs = document.attrs[index]
+        if attrs.get("role") == "progressbar" and "progress-bar" in _classes(
+            attrs.get("class")
+        ):
+            self.progress_bars.append(index)
+
+    def string(self, document: _Document, index: int) -> None:
+        """Match a string against every string-level field pattern."""
+        value = document.strings[index]
+
+        # Look for pattern like "125 Gal Propane" or "125 gal. | PROPANE"
+        match = _CAPACITY_PATTERN.search(value)
+        if match:
+            try:
+                capacity = float(match.group(1))
+            except ValueError:
+                pass
+            else:
+                self.capacity_strings.append(index)
+                self.capacities.append((capacity, match.group(3).upper()))
+
+        # Capacity without a fuel type, only used if the above never matches
+        match = _SIMPLE_CAPACITY_PATTERN.search(value)
+        if match:
+            try:
+                capacity = float(match.group(1))
+            except ValueError:
+                pass
+            else:
+                self.simple_capacity_strings.append(index)
+                self.simple_capacities.append(capacity)
+
+        # Dates and prices need the text of the parent element, which is only
+        # complete once the traversal has finished
+        if _DELIVERY_PATTERN.search(value):
+            self.delivery_strings.append(index)
+        if _READING_PATTERN.search(value):
+            self.reading_strings.append(index)
+        if _PRICE_PATTERN.search(value):
+            self.price_strings.append(index)
+
+    def tank_containers(self, document: _Document) -> list[_TankContainer]:
+        """Return the part of the page holding each tank, one per progress bar.
+
+        A tank's container is the outermost ancestor of its progress bar that
+        holds no other progress bar. On a single tank page that is the whole
+        document. When those ancestors hold nothing but the bars, the tanks
+        are laid out flat in a shared parent, which is split into the runs
+        of siblings around each bar instead.
+        """
+        bars = self.progress_bars
+        elements = []
+        for bar in bars:
+            container = bar
+            parent = document.element_parents[container]
+            while parent != -1:
+                first = bisect_left(bars, parent)
+                last = bisect_left(bars, document.element_ends[parent])
+                if last - first > 1:
+                    break
+                container = parent
+                parent = document.element_parents[container]
+            elements.append(container)
+
+        parent = document.element_parents[elements[0]]
+        if (
+            len(elements) > 1
+            and parent != -1
+            and all(
+                document.element_parents[element] == parent
+                and document.element_text(element) == document.element_text(bar)
+                for element, bar in zip(elements, bars)
+            )
+        ):
+            return self._flat_containers(document, parent, elements)
+        return [_TankContainer.of(document, element) for element in elements]
+
+    @staticmethod
+    def _flat_containers(
+        document: _Document, parent: int, elements: list[int]
+    ) -> list[_TankContainer]:
+        """Split a shared parent into the run of siblings of each tank.
+
+        Siblings before the first bar that repeat before the second bar,
+        like a heading and the capacity, start the run of every tank; each
+        run ends where the next one starts, the last one after as many
+        siblings as the first.
+        """
+        children = _children(document, parent)
+        positions = [children.index(element) for element in elements]
+        period = positions[1] - positions[0]
+        lead = 0
+        while (
+            lead + 1 < period
+            and positions[0] - lead - 1 >= 0
+            and _signature(document, children[positions[0] - lead - 1])
+            == _signature(document, children[positions[1] - lead - 1])
+        ):
+            lead += 1
+        starts = [position - lead for position in positions]
+        stops = [*starts[1:], min(starts[-1] + period, len(children))]
+        return [
+            _TankContainer(
+                parent,
+                children[start],
+                document.element_ends[children[stop - 1]],
+                document.starts[children[start]],
+                document.ends[children[stop - 1]],
+            )
+            for start, stop in zip(starts, stops)
+        ]
+
+    def tank_ids(
+        self, document: _Document, containers: list[_TankContainer]
+    ) -> list[str]:
+        """Return a stable identifier for each tank.
+
+        The nearest element with an ``id`` between a progress bar and its
+        container identifies the tank. When not every tank has a distinct id
+        the tanks are numbered in page order instead.
+        """
+        ids = []
+        for bar, container in zip(self.progress_bars, containers):
+            element = bar
+            while True:
+                if tank_id := document.attrs[element].get("id"):
+                    ids.append(str(tank_id))
+                    break
+                if element == container.element:
+                    ids.append("")
+                    break
+                element = document.element_parents[element]
+        if all(ids) and len(set(ids)) == len(ids):
+            return ids
+        return [str(number) for number in range(1, len(ids) + 1)]
+
+    @staticmethod
+    def tank_level(document: _Document, bar: int) -> float:
+        """Return the tank level percentage from a progress bar."""
+        value = document.attrs[bar].get("aria-valuenow")
+        if not value:
+            raise ParsingError("Could not find tank level in page")
+
+        try:
+            return float(value)
+        except (ValueError, TypeError) as err:
+            raise ParsingError(f"Invalid tank level value: {err}") from err
+
+    def gallons_remaining(
+        self, document: _Document, container: _TankContainer
+    ) -> float | None:
+        """Return the gallons from text like "Approximately 41 gallons in tank"."""
+        divs = _within(self.divs, container.element_start, container.element_end)
+        for index in document.elements_containing(divs, _GALLONS_PHRASE):
+            match = _GALLONS_PATTERN.search(document.element_text(index))
+            if match:
+                try:
+                    return float(match.group(1))
+                except ValueError:
+                    pass
+        return None
+
+    def capacity(
+        self, document: _Document, container: _TankContainer
+    ) -> tuple[float | None, str | None]:
+        """Return the tank capacity and fuel type."""
+        start = container.start
+        end = container.end
+        position = bisect_left(self.capacity_strings, start)
+        if position < len(self.capacity_strings) and self.capacity_strings[position] < end:
+            return self.capacities[position]
+
+        position = bisect_left(self.simple_capacity_strings, start)
+        if (
+            position < len(self.simple_capacity_strings)
+            and self.simple_capacity_strings[position] < end
+        ):
+            self.stats.fallback("capacity_without_fuel_type")
+            return self.simple_capacities[position], None
+        return None, None
+
+    @staticmethod
+    def date_near(document: _Document, strings: list[int]) -> str | None:
+        """Return the first MM/DD/YYYY style date next to a label string."""
+        for index in strings:
+            parent_text = document.element_text(document.parents[index])
+            match = _DATE_PATTERN.search(parent_text)
+            if match:
+                return match.group(1)
+        return None
+
+    def current_price(
+        self,
+        document: _Document,
+        strings: list[int],
+        text_range: tuple[int, int] | None,
+    ) -> float | None:
+        """Return the price from text like "$3.1400 / gal" or "$2.50/gal"."""
+        for index in strings:
+            text = document.strings[index].strip()
+            # Use the parent's full text to check for price context
+            parent_text = document.element_text(document.parents[index])
+            if any(keyword in parent_text.lower() for keyword in _PRICE_KEYWORDS):
+                match = _PRICE_PATTERN.search(text)
+                if match:
+                    try:
+                        price = float(match.group(1))
+                    except ValueError:
+                        continue
+                    _LOGGER.debug(
+                        "Found price in text element: %s (parent: %s)", text, parent_text
+                    )
+                    return price
+
+        if text_range is None:
+            return None
+
+        # Fall back to dollar amounts followed by "/ gal" anywhere in the range
+        match = _PRICE_FULL_TEXT_PATTERN.search(document.full_text(*text_range))
+        if match:
+            try:
+                price = float(match.group(1))
+            except ValueError:
+                return None
+            _LOGGER.debug("Found price in full text: %s", match.group(0))
+            self.stats.fallback("price_full_text")
+            return price
+        return None
+
+    def tank(
+        self,
+        document: _Document,
+        bar: int,
+        container: _TankContainer,
+        page: dict[str, Any],
+    ) -> TankReading:
+        """Return the reading of one tank.
+
+        Delivery date, reading date and price may be shown once for the whole
+        account; they are taken from the page when the tank has none.
+        """
+        timed = self.timed
+        tank_level_percent = timed("tank_level", self.tank_level, document, bar)
+
+        gallons_remaining = timed(
+            "gallons_remaining", self.gallons_remaining, document, container
+        )
+        if gallons_remaining is None:
+            _LOGGER.warning("Could not find gallons remaining in page")
+
+        tank_capacity, fuel_type = timed("capacity", self.capacity, document, container)
+        if tank_capacity is None:
+            _LOGGER.warning("Could not find tank capacity in page")
+
+        if fuel_type is None:
+            _LOGGER.debug("Could not find fuel type in page")
+
+        start = container.start
+        end = container.end
+
+        last_delivery_date = timed(
+            "last_delivery_date",
+            self.date_near,
+            document,
+            _within(self.delivery_strings, start, end),
+        )
+        if last_delivery_date is None:
+            last_delivery_date = self._account_field(page, "last_delivery_date")
+        if last_delivery_date is None:
+            _LOGGER.debug("Could not find last delivery date in page")
+
+        reading_date = timed(
+            "reading_date",
+            self.date_near,
+            document,
+            _within(self.reading_strings, start, end),
+        )
+        if reading_date is None:
+            reading_date = self._account_field(page, "reading_date")
+        if reading_date is None:
+            _LOGGER.debug("Could not find reading date in page")
+
+        current_price = timed(
+            "current_price",
+            self.current_price,
+            document,
+            _within(self.price_strings, start, end),
+            (start, end),
+        )
+        if current_price is None:
+            current_price = self._account_field(page, "current_price")
+        if current_price is None:
+            _LOGGER.debug("Could not find current price in page")
+
+        return TankReading(
+            tank_level_percent,
+            gallons_remaining,
+            tank_capacity,
+            fuel_type,
+            parse_date(last_delivery_date),
+            parse_date(reading_date),
+            current_price,
+        )
+
+    def timed(self, name: str, extractor: Callable[..., _T], *args: Any) -> _T:
+        """Run a field extractor or parse stage, adding its time to the stats."""
+        start = time.perf_counter()
+        try:
+            return extractor(*args)
+        finally:
+            self.stats.add_time(name, time.perf_counter() - start)
+
+    def _account_field(self, page: dict[str, Any], name: str) -> Any:
+        """Return a field shown for the whole account, counting its use."""
+        value = page.get(name)
+        if value is not None:
+            self.stats.fallback(f"account_{name}")
+        return value
+
+    def account_fields(
+        self, document: _Document, containers: list[_TankContainer]
+    ) -> dict[str, Any]:
+        """Return the fields shown outside of every tank on the page."""
+        if len(containers) < 2:
+            # A single tank's container is the whole page already
+            return {}
+
+        ranges = [(container.start, container.end) for container in containers]
+
+        def outside(strings: list[int]) -> list[int]:
+            return [
+                index
+                for index in strings
+                if not any(start <= index < end for start, end in ranges)
+            ]
+
+        return {
+            "last_delivery_date": self.date_near(document, outside(self.delivery_strings)),
+            "reading_date": self.date_near(document, outside(self.reading_strings)),
+            "current_price": self.current_price(document, outside(self.price_strings), None),
+        }
+
+
+class _DeliveryPageVisitor:
+    """Collect the table rows and page links of the delivery history."""
+
+    __slots__ = ("cells", "last_page")
+
+    def __init__(self) -> None:
+        """Initialize the visitor."""
+        # Cells of every table row, keyed by row element in page order
+        self.cells: dict[int, list[int]] = {}
+        self.last_page = 1
+
+    def element(self, document: _Document, index: int) -> None:
+        """Record table cells under their row, and links to other pages."""
+        name = document.names[index]
+        if name == "tr":
+            self.cells[index] = []
+        elif name in ("td", "th"):
+            row = document.element_parents[index]
+            while row != -1 and document.names[row] != "tr":
+                row = document.element_parents[row]
+            if row in self.cells:
+                self.cells[row].append(index)
+        elif name == "a":
+            match = _PAGE_LINK_PATTERN.search(str(document.attrs[index].get("href", "")))
+            if match:
+                self.last_page = max(self.last_page, int(match.group(1)))
+
+    def string(self, document: _Document, index: int) -> None:
+        """Ignore strings, cells are read once the traversal has finished."""
+
+    def columns(self, document: _Document) -> dict[str, int]:
+        """Return the column index of each delivery field, from the header row."""
+        for cells in self.cells.values():
+            if not cells or any(document.names[cell] != "th" for cell in cells):
+                continue
+            headers = [document.element_text(cell).lower() for cell in cells]
+            columns: dict[str, int] = {}
+            for field, keywords in _DELIVERY_COLUMNS:
+                for position, header in enumerate(headers):
+                    if position not in columns.values() and any(
+                        keyword in header for keyword in keywords
+                    ):
+                        columns[field] = position
+                        break
+            if "delivery_date" in columns:
+                return columns
+        return {}
+
+    def deliveries(self, document: _Document) -> list[Delivery]:
+        """Return a delivery for each data row with a date."""
+        columns = self.columns(document)
+        if not columns:
+            return []
+        deliveries = []
+        for cells in self.cells.values():
+            if not cells or document.names[cells[0]] != "td":
+                continue
+            values = {
+                field: document.element_text(cells[position])
+                for field, position in columns.items()
+                if position < len(cells)
+            }
+            match = _DATE_PATTERN.search(values.get("delivery_date", ""))
+            delivery_date = parse_date(match.group(1)) if match else None
+            if delivery_date is None:
+                continue
+            deliveries.append(
+                Delivery(
+                    delivery_date,
+                    _number(values.get("gallons")),
+                    _number(values.get("price")),
+                    _number(values.get("amount")),
+                    values.get("invoice") or None,
+                )
+            )
+        return deliveries
+
+
+def _number(text: str | None) -> float | None:
+    """Return the first number in a cell like "$1,234.50", if any."""
+    if not text:
+        return None
+    match = _NUMBER_PATTERN.search(text)
+    if match is None:
+        return None
+    try:
+        return float(match.group(0).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _within(indices: list[int], start: int, end: int) -> list[int]:
+    """Return the sorted indices in the range [start, end)."""
+    return indices[bisect_left(indices, start) : bisect_left(indices, end)]
+
+
+def page_fingerprint(html: str) -> bytes:
+    """Return a fingerprint of the data region of a page.
+
+    The head only carries asset links, and anti-forgery tokens change on
+    every request, so both are left out.
+    """
+    match = _BODY_PATTERN.search(html)
+    region = html[match.start() :] if match else html
+    region = _CSRF_INPUT_PATTERN.sub("", region)
+    return hashlib.blake2b(region.encode(), digest_size=16).digest()
+
+
+class TankPageReader:
+    """Collect a Tank page fed in chunks, up to the end of its body.
+
+    The page is scanned tag by tag as it arrives, skipping comments,
+    scripts and styles, and reading stops at ``</body>``. Tank markup can
+    follow any footer of the page, so nothing before the end of the body is
+    skipped, and the parser finds the same values as in the whole page.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty page."""
+        self._parts: list[str] = []
+        # End of the page not scanned yet, from an incomplete tag on, and
+        # its offset in the page
+        self._rest = ""
+        self._rest_at = 0
+        self._end: int | None = None
+
+    @property
+    def complete(self) -> bool:
+        """Return True once the end of the body was read."""
+        return self._end is not None
+
+    @property
+    def html(self) -> str:
+        """Return the page read so far, cut after the end of the body."""
+        html = "".join(self._parts)
+        return html if self._end is None else html[: self._end]
+
+    def feed(self, text: str) -> bool:
+        """Add the next chunk of the page and return True if it is complete."""
+        if self._end is not None:
+            return True
+        self._parts.append(text)
+        buffer = self._rest + text
+        position = 0
+        while (match := _TAG_PATTERN.search(buffer, position)) is not None:
+            comment_end, closing, name, _ = match.groups()
+            if name is None:
+                if comment_end is None:
+                    # The comment ends in a later chunk
+                    position = match.start()
+                    break
+                position = match.end()
+                continue
+
+            name = name.lower()
+            if closing and name == "body":
+                self._end = self._rest_at + match.end()
+                return True
+            if not closing and name in _RAW_TEXT_ENDS:
+                # Scripts and styles may hold anything that looks like a tag
+                end = _RAW_TEXT_ENDS[name].search(buffer, match.end())
+                if end is None:
+                    position = match.start()
+                    break
+                position = end.end()
+                continue
+            position = match.end()
+        else:
+            # Keep a tag that may be cut off at the end of the chunk
+            tag_start = buffer.rfind("<", position)
+            position = tag_start if tag_start != -1 else len(buffer)
+
+        self._rest = buffer[position:]
+        self._rest_at += position
+        return False
+
+
+def parse_csrf_token(html: str, backend: str | None = None) -> str:
+    """Extract the CSRF token from the login page.
+
+    Raises:
+        ParsingError: If the page has no token
+
+    """
+    visitor = _LoginPageVisitor()
+    document = _parse(html, visitor, backend)
+    if visitor.token_input is None:
+        raise ParsingError("Could not find CSRF token in login page")
+    token = document.attrs[visitor.token_input].get("value")
+    if not token:
+        raise ParsingError("Could not find CSRF token in login page")
+    return token
+
+
+def parse_tank_page(
+    html: str, backend: str | None = None, stats: ParseStats | None = None
+) -> dict[str, TankReading]:
+    """Extract the reading of every tank from the Tank page.
+
+    Args:
+        html: The Tank page
+        backend: Tree backend, see resolve_backend
+        stats: Stats to add the time of the walk, each stage and each field
+            extractor to, and the fallbacks taken
+
+    Returns:
+        Dictionary of tank readings keyed by tank identifier, in page order
+
+    Raises:
+        ParsingError: If no tank level can be read from the page
+
+    """
+    visitor = _TankPageVisitor(stats)
+    timed = visitor.timed
+    document = timed("walk", _parse, html, visitor, backend)
+
+    if not visitor.progress_bars:
+        raise ParsingError("Could not find tank level in page")
+
+    containers = timed("tank_containers", visitor.tank_containers, document)
+    tank_ids = visitor.tank_ids(document, containers)
+    page = timed("account_fields", visitor.account_fields, document, containers)
+
+    tanks: dict[str, TankReading] = {}
+    error: ParsingError | None = None
+    for tank_id, bar, container in zip(tank_ids, visitor.progress_bars, containers):
+        try:
+            tanks[tank_id] = visitor.tank(document, bar, container, page)
+        except ParsingError as err:
+            _LOGGER.warning("Skipping tank %s: %s", tank_id, err)
+            error = error or err
+            continue
+
+        _LOGGER.debug("Parsed tank %s data: %s", tank_id, tanks[tank_id])
+
+    if not tanks and error is not None:
+        raise error
+    return tanks
+
+
+class DeliveryPage(NamedTuple):
+    """One page of the delivery history."""
+
+    deliveries: list[Delivery]
+    last_page: int
+
+
+def parse_delivery_page(html: str, backend: str | None = None) -> DeliveryPage:
+    """Extract the deliveries from a page of the delivery history.
+
+    The history is a table with a header row naming its columns; at least
+    a date column is needed. Pages are linked with a ``page`` query
+    parameter, and the highest page linked is taken as the last one.
+
+    Returns:
+        The deliveries in page order, and the number of the last page
+
+    Raises:
+        ParsingError: If the page has no delivery table
+
+    """
+    visitor = _DeliveryPageVisitor()
+    document = _parse(html, visitor, backend)
+    if not visitor.columns(document):
+        raise ParsingError("Could not find delivery table in page")
+    deliveries = visitor.deliveries(document)
+    _LOGGER.debug(
+        "Parsed %d deliveries, last page is %d", len(deliveries), visitor.last_page
+    )
+    return DeliveryPage(deliveries, visitor.last_page)
@@ -0,0 +1,105 @@
+"""Regular expressions of MyFuelPortal, compiled on first use."""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+# Methods of a compiled pattern bound onto a LazyPattern once it is compiled
+_PATTERN_METHODS = (
+    "search",
+    "match",
+    "fullmatch",
+    "finditer",
+    "findall",
+    "split",
+    "sub",
+    "subn",
+)
+
+
+class LazyPattern:
+    """A regular expression compiled the first time one of its methods is used.
+
+    Compiling binds the methods of the compiled pattern onto the instance,
+    so later calls go straight to the compiled pattern without going
+    through this class. Two threads compiling at once is harmless, both
+    bind equivalent patterns.
+    """
+
+    def __init__(self, name: str, pattern: str, flags: int = 0) -> None:
+        """Initialize the pattern without compiling it."""
+        self.name = name
+        self.pattern = pattern
+        self.flags = flags
+        self.compiled: re.Pattern[str] | None = None
+
+    def compile(self) -> re.Pattern[str]:
+        """Compile the pattern, if not done yet, and return it."""
+        if self.compiled is None:
+            compiled = re.compile(self.pattern, self.flags)
+            for method in _PATTERN_METHODS:
+                setattr(self, method, getattr(compiled, method))
+            self.compiled = compiled
+        return self.compiled
+
+    def __getattr__(self, name: str) -> Any:
+        """Compile the pattern when a method is used before it was compiled."""
+        if name not in _PATTERN_METHODS:
+            raise AttributeError(name)
+        return getattr(self.compile(), name)
+
+    def __repr__(self) -> str:
+        """Return the name and source of the pattern."""
+        state = "compiled" if self.compiled is not None else "not compiled"
+        return f"LazyPattern({self.name!r}, {self.pattern!r}, {state})"
+
+
+class PatternRegistry:
+    """The regular expressions of the integration, by name.
+
+    Modules register their patterns when they are imported, which costs
+    nothing; each pattern is compiled by the first parse that uses it, so
+    loading the integration doesn't pay for patterns of pages it never
+    parses.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._patterns: dict[str, LazyPattern] = {}
+
+    def register(self, name: str, pattern: str, flags: int = 0) -> LazyPattern:
+        """Register a pattern under a unique name and return it.
+
+        Raises:
+            ValueError: If another pattern is registered under the name
+
+        """
+        if (existing := self._patterns.get(name)) is not None:
+            if (existing.pattern, existing.flags) != (pattern, flags):
+                raise ValueError(f"Pattern {name} is already registered")
+            return existing
+        self._patterns[name] = lazy = LazyPattern(name, pattern, flags)
+        return lazy
+
+    def __getitem__(self, name: str) -> LazyPattern:
+        """Return a registered pattern."""
+        return self._patterns[name]
+
+    def compile_all(self) -> None:
+        """Compile every registered pattern."""
+        for lazy in self._patterns.values():
+            lazy.compile()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return how many patterns are registered and compiled."""
+        return {
+            "registered": len(self._patterns),
+            "compiled": sum(
+                lazy.compiled is not None for lazy in self._patterns.values()
+            ),
+        }
+
+
+# The registry shared by every module of the integration
+PATTERNS = PatternRegistry()
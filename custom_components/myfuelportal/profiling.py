@@ -0,0 +1,162 @@
+"""Profiling of a single refresh for MyFuelPortal."""
+
+from __future__ import annotations
+
+import cProfile
+from io import StringIO
+import logging
+import os
+import pstats
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .metrics import (
+    PHASE_DELIVERY_FETCH,
+    PHASE_FLEET_WAIT,
+    PHASE_LOGIN_GET,
+    PHASE_LOGIN_POST,
+    PHASE_TANK_FETCH,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import MyCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions listed in each table of the report
+REPORT_LIMIT = 40
+
+# Request phases, timed from sending a request until its body was read
+_NETWORK_PHASES = (
+    PHASE_LOGIN_GET,
+    PHASE_LOGIN_POST,
+    PHASE_TANK_FETCH,
+    PHASE_DELIVERY_FETCH,
+)
+_PARSE_FUNCTIONS = ("parse_csrf_token", "parse_tank_page", "parse_delivery_page")
+# Where the regular expression engine shows up in profiles
+_REGEX_METHOD = "of 're.Pattern' objects"
+_REGEX_MODULES = (
+    f"{os.sep}re{os.sep}",
+    f"{os.sep}re.py",
+    "sre_compile.py",
+    "sre_parse.py",
+)
+
+
+async def async_profile_refresh(
+    hass: HomeAssistant, coordinator: MyCoordinator
+) -> str:
+    """Run a refresh under cProfile and save a report to the config dir.
+
+    Parsing runs on the event loop for this refresh, so the profiler, which
+    only sees the thread it was enabled on, covers it. Time spent waiting
+    for the portal is taken from the request phase timings, as a profiler
+    does not attribute time a coroutine spends suspended.
+
+    Returns:
+        The path of the text report; the raw profile is saved next to it
+        with a .prof extension
+
+    Raises:
+        HomeAssistantError: If another profiler is running
+
+    """
+    api = coordinator.api
+    metrics = api.metrics
+    before = dict(metrics.totals)
+    profiler = cProfile.Profile()
+    parse_in_executor = api.parse_in_executor
+    api.parse_in_executor = False
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError as err:
+        api.parse_in_executor = parse_in_executor
+        raise HomeAssistantError(f"Could not start the profiler: {err}") from err
+    try:
+        await coordinator.async_refresh()
+    finally:
+        profiler.disable()
+        api.parse_in_executor = parse_in_executor
+    elapsed = time.perf_counter() - start
+
+    phases = {
+        phase: metrics.totals.get(phase, 0.0) - before.get(phase, 0.0)
+        for phase in (*_NETWORK_PHASES, PHASE_FLEET_WAIT)
+    }
+    base = hass.config.path(
+        f"{DOMAIN}_profile_{coordinator.entry.entry_id}_"
+        f"{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}"
+    )
+    report = _report(coordinator, profiler, elapsed, phases)
+    await hass.async_add_executor_job(_write, base, report, profiler)
+    _LOGGER.info("Saved the profile of a refresh to %s.txt", base)
+    return f"{base}.txt"
+
+
+def _report(
+    coordinator: MyCoordinator,
+    profiler: cProfile.Profile,
+    elapsed: float,
+    phases: dict[str, float],
+) -> str:
+    """Return the text report of a profiled refresh."""
+    stats = pstats.Stats(profiler)
+    entries: dict[tuple[str, int, str], Any] = stats.stats  # type: ignore[attr-defined]
+    parsing = sum(
+        cumulative
+        for (filename, _, function), (_, _, _, cumulative, _) in entries.items()
+        if function in _PARSE_FUNCTIONS and filename.endswith("parser.py")
+    )
+    regex = sum(
+        own
+        for (filename, _, function), (_, _, own, _, _) in entries.items()
+        if _REGEX_METHOD in function
+        or any(module in filename for module in _REGEX_MODULES)
+    )
+    network = sum(phases[phase] for phase in _NETWORK_PHASES)
+
+    lines = [
+        f"MyFuelPortal refresh profile of {coordinator.entry.title}",
+        f"Taken at {dt_util.utcnow().isoformat()}",
+        f"Refresh succeeded: {coordinator.last_update_success}",
+        "",
+        f"{'Refresh':<28}{elapsed * 1000:10.1f} ms",
+        f"{'Waiting for a request slot':<28}{phases[PHASE_FLEET_WAIT] * 1000:10.1f} ms",
+        f"{'Network':<28}{network * 1000:10.1f} ms",
+        *(
+            f"  {phase:<26}{phases[phase] * 1000:10.1f} ms"
+            for phase in _NETWORK_PHASES
+            if phases[phase]
+        ),
+        f"{'HTML parsing':<28}{parsing * 1000:10.1f} ms",
+        f"  {'of which regex matching':<26}{regex * 1000:10.1f} ms",
+        "",
+        "Network time includes reading response bodies; parsing ran on the",
+        "event loop for this refresh. Times of other integrations running on",
+        "the event loop meanwhile are included in the tables below.",
+        "",
+    ]
+    for title, order in (
+        ("By cumulative time", pstats.SortKey.CUMULATIVE),
+        ("By own time", pstats.SortKey.TIME),
+    ):
+        stream = StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(order).print_stats(
+            REPORT_LIMIT
+        )
+        lines.extend((title, "=" * len(title), stream.getvalue()))
+    return "\n".join(lines)
+
+
+def _write(base: str, report: str, profiler: cProfile.Profile) -> None:
+    """Write the report and the raw profile."""
+    with open(f"{base}.txt", "w", encoding="utf-8") as file:
+        file.write(report)
+    profiler.dump_stats(f"{base}.prof")
@@ -0,0 +1,137 @@
+"""Adaptive polling schedule for MyFuelPortal."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+_MINUTES_PER_DAY = 24 * 60
+
+# Number of observed reading changes needed before the window is trusted
+_MIN_SAMPLES = 3
+# Observed changes remembered for learning the window
+_MAX_SAMPLES = 14
+# Longest time range recorded for one change, anchored at the poll that saw it
+_MAX_SAMPLE_SPAN = 180  # minutes
+# Widest window still considered a daily pattern
+_MAX_WINDOW = 12 * 60  # minutes
+# Extra polling time on both sides of the learned window
+_WINDOW_MARGIN = 30  # minutes
+
+
+def _minute_of_day(moment: datetime) -> int:
+    """Return the minute of the day of a local time."""
+    return moment.hour * 60 + moment.minute
+
+
+class ReadingSchedule:
+    """Learn when the portal publishes new readings and plan the next poll.
+
+    Every time the reading date changes, the time-of-day range between the
+    poll that still saw the old reading and the poll that saw the new one is
+    recorded. The learned window covers those ranges; polls are dense inside
+    it until the new reading shows up and sparse for the rest of the day.
+    Until a window is learned, polls are as sparse as allowed.
+    """
+
+    def __init__(self, min_interval: timedelta, max_interval: timedelta) -> None:
+        """Initialize the schedule with the allowed interval range."""
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.samples: list[tuple[int, int]] = []
+        self.last_poll: datetime | None = None
+        self.last_change: datetime | None = None
+        self.last_reading: str | None = None
+
+    def observe(self, now: datetime, reading: str | None) -> bool:
+        """Record a successful poll and return True if the reading changed."""
+        changed = (
+            reading is not None
+            and self.last_reading is not None
+            and reading != self.last_reading
+        )
+        if changed and self.last_poll is not None:
+            end = _minute_of_day(now)
+            span = min(
+                int((now - self.last_poll).total_seconds() // 60), _MAX_SAMPLE_SPAN
+            )
+            self.samples.append(((end - span) % _MINUTES_PER_DAY, end))
+            del self.samples[:-_MAX_SAMPLES]
+            self.last_change = now
+            _LOGGER.debug("New reading %s seen, learned window: %s", reading, self.window())
+        if reading is not None:
+            self.last_reading = reading
+        self.last_poll = now
+        return changed
+
+    def window(self) -> tuple[int, int] | None:
+        """Return the (start, end) minutes of the day when readings change.
+
+        The window may wrap around midnight, in which case start > end.
+        """
+        if len(self.samples) < _MIN_SAMPLES:
+            return None
+
+        # The window is the complement of the largest gap between the
+        # recorded ranges on the 24 hour clock
+        points = sorted({minute for sample in self.samples for minute in sample})
+        gap, start = max(
+            ((points[(index + 1) % len(points)] - point) % _MINUTES_PER_DAY, index)
+            for index, point in enumerate(points)
+        )
+        if len(points) == 1:
+            gap = _MINUTES_PER_DAY
+        if _MINUTES_PER_DAY - gap > _MAX_WINDOW:
+            # Readings show up at any time of day, there is no pattern
+            return None
+        window_start = points[(start + 1) % len(points)]
+        window_end = points[start]
+        return (
+            (window_start - _WINDOW_MARGIN) % _MINUTES_PER_DAY,
+            (window_end + _WINDOW_MARGIN) % _MINUTES_PER_DAY,
+        )
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Return the time until the next poll."""
+        window = self.window()
+        if window is None:
+            interval = self.max_interval
+        else:
+            start, end = window
+            minute = _minute_of_day(now)
+            since_start = (minute - start) % _MINUTES_PER_DAY
+            if since_start <= (end - start) % _MINUTES_PER_DAY:
+                window_start = now - timedelta(minutes=since_start, seconds=now.second)
+                if self.last_change is not None and self.last_change >= window_start:
+                    # Today's reading is in, wait for tomorrow's window
+                    interval = timedelta(minutes=_MINUTES_PER_DAY - since_start)
+                else:
+                    interval = self.min_interval
+            else:
+                interval = timedelta(minutes=(start - minute) % _MINUTES_PER_DAY)
+        return self.clamp(interval)
+
+    def clamp(self, interval: timedelta) -> timedelta:
+        """Return the interval kept within the allowed range."""
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned state for storage."""
+        return {
+            "samples": [list(sample) for sample in self.samples],
+            "last_poll": self.last_poll.isoformat() if self.last_poll else None,
+            "last_change": self.last_change.isoformat() if self.last_change else None,
+            "last_reading": self.last_reading,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the learned state from storage."""
+        self.samples = [(start, end) for start, end in data.get("samples", [])]
+        if last_poll := data.get("last_poll"):
+            self.last_poll = datetime.fromisoformat(last_poll)
+        if last_change := data.get("last_change"):
+            self.last_change = datetime.fromisoformat(last_change)
+        self.last_reading = data.get("last_reading")
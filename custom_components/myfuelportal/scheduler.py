@@ -0,0 +1,118 @@
+"""Polling scheduler shared by all MyFuelPortal accounts."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+import heapq
+import itertools
+import logging
+import random
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_FLEET_SCHEDULER,
+    DOMAIN,
+    FLEET_JITTER_FRACTION,
+    FLEET_MAX_CONCURRENT_REQUESTS,
+    FLEET_MAX_JITTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FleetScheduler:
+    """Coordinate the portal requests of every configured account.
+
+    Each config entry keeps its own coordinator and timer, but a refresh
+    only talks to the portal while it holds one of a limited number of
+    slots. When slots are short, waiting refreshes are served stalest
+    first, so an account that has gone longest without data is not stuck
+    behind accounts that just updated. Poll intervals get a random jitter
+    so accounts set up together drift apart instead of polling in bursts.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = FLEET_MAX_CONCURRENT_REQUESTS,
+        jitter_fraction: float = FLEET_JITTER_FRACTION,
+        max_jitter: timedelta = FLEET_MAX_JITTER,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.max_concurrent = max_concurrent
+        self.jitter_fraction = jitter_fraction
+        self.max_jitter = max_jitter
+        self.active = 0
+        # Heap of (last success, arrival order, waiter); entries that never
+        # updated use -inf and go first
+        self._waiting: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._order = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of refreshes waiting for a slot."""
+        return sum(not waiter.done() for _, _, waiter in self._waiting)
+
+    @asynccontextmanager
+    async def slot(self, last_success: float | None) -> AsyncIterator[None]:
+        """Hold a request slot, waiting for one if all are in use.
+
+        Args:
+            last_success: Monotonic time of the entry's last successful
+                update, or None if it never updated
+
+        """
+        await self._async_acquire(
+            float("-inf") if last_success is None else last_success
+        )
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _async_acquire(self, priority: float) -> None:
+        """Take a slot, or queue until _release hands one over."""
+        if self.active < self.max_concurrent and not self.waiting:
+            self.active += 1
+            return
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), waiter))
+        _LOGGER.debug(
+            "All %s portal request slots in use, %s refreshes waiting",
+            self.max_concurrent,
+            self.waiting,
+        )
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot to the stalest waiting refresh, or free it."""
+        while self._waiting:
+            _, _, waiter = heapq.heappop(self._waiting)
+            if not waiter.done():
+                # The slot moves to the waiter, active stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def jitter(self, interval: timedelta) -> timedelta:
+        """Return the interval moved randomly by a small part of itself."""
+        spread = min(interval * self.jitter_fraction, self.max_jitter)
+        return interval + spread * random.uniform(-1, 1)
+
+
+def async_get_fleet_scheduler(hass: HomeAssistant) -> FleetScheduler:
+    """Return the scheduler shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_FLEET_SCHEDULER not in domain_data:
+        domain_data[DATA_FLEET_SCHEDULER] = FleetScheduler()
+    return domain_data[DATA_FLEET_SCHEDULER]
@@ -2,20 +2,58 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
+    SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import PERCENTAGE, UnitOfVolume
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+    UnitOfVolume,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-
-from .const import ATTR_GALLONS_REMAINING, ATTR_TANK_LEVEL, ATTR_TANK_CAPACITY, ATTR_FUEL_TYPE, ATTR_LAST_DELIVERY_DATE, ATTR_READING_DATE, ATTR_CURRENT_PRICE, DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CURRENT_PRICE,
+    ATTR_DATA_FETCHED,
+    ATTR_FROM_SNAPSHOT,
+    ATTR_FUEL_TYPE,
+    ATTR_GALLONS_REMAINING,
+    ATTR_LAST_DELIVERY_DATE,
+    ATTR_READING_DATE,
+    ATTR_TANK_CAPACITY,
+    CONF_PRIMARY_TANK,
+    DOMAIN,
+    SIGNAL_METRICS_UPDATED,
+)
+from .consumption import UsageForecast
 from .coordinator import MyCoordinator
+from .metrics import (
+    COUNTER_BYTES_RECEIVED,
+    COUNTER_PARSE_FALLBACKS,
+    COUNTER_REAUTHS,
+    PHASE_REFRESH,
+    PHASE_TANK_FETCH,
+    PHASE_TANK_PARSE,
+    RefreshMetrics,
+)
+from .models import TankReading
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
@@ -31,267 +69,380 @@ async def async_setup_entry(
     """Set up the sensor platform."""
     coordinator: MyCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    # Create sensor entities
-    sensors = [
-        TankLevelSensor(coordinator, entry),
-        GallonsRemainingSensor(coordinator, entry),
-        TankCapacitySensor(coordinator, entry),
-        FuelTypeSensor(coordinator, entry),
-        LastDeliveryDateSensor(coordinator, entry),
-        ReadingDateSensor(coordinator, entry),
-        CurrentPriceSensor(coordinator, entry),
-    ]
-
-    async_add_entities(sensors)
+    # The first tank on the page keeps the entity IDs of single tank setups;
+    # it is saved, so the tank stays primary when the page order changes
+    primary_tank: str | None = entry.data.get(CONF_PRIMARY_TANK)
+    known_tanks: set[str] = set()
+
+    @callback
+    def _async_add_new_tanks() -> None:
+        """Create sensor entities for tanks not seen before."""
+        nonlocal primary_tank
+        if not coordinator.data:
+            return
+        if primary_tank is None:
+            primary_tank = next(iter(coordinator.data))
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_PRIMARY_TANK: primary_tank}
+            )
+        sensors: list[SensorEntity] = []
+        for tank_id in coordinator.data:
+            if tank_id in known_tanks:
+                continue
+            known_tanks.add(tank_id)
+            # The sensors of a tank share one device
+            primary = tank_id == primary_tank
+            device_info = tank_device_info(entry, tank_id, primary)
+            sensors.extend(
+                MyFuelPortalSensor(
+                    coordinator, entry, tank_id, primary, device_info, description
+                )
+                for description in SENSOR_DESCRIPTIONS
+            )
+            sensors.extend(
+                MyFuelPortalForecastSensor(
+                    coordinator, entry, tank_id, primary, device_info, description
+                )
+                for description in FORECAST_SENSOR_DESCRIPTIONS
+            )
+        if sensors:
+            async_add_entities(sensors)
+
+    _async_add_new_tanks()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_tanks))
+
+    # Performance sensors belong to the account, shown on the first tank's device
+    device_info = tank_device_info(entry, primary_tank or "", True)
+    async_add_entities(
+        MyFuelPortalMetricSensor(coordinator, entry, device_info, description)
+        for description in METRIC_SENSOR_DESCRIPTIONS
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class MyFuelPortalSensorEntityDescription(SensorEntityDescription):
+    """Describes a MyFuelPortal tank sensor."""
+
+    value_fn: Callable[[TankReading], StateType | date]
+
+
+# The keys are the suffixes of the unique IDs
+SENSOR_DESCRIPTIONS: tuple[MyFuelPortalSensorEntityDescription, ...] = (
+    MyFuelPortalSensorEntityDescription(
+        key="tank_level",
+        name="Tank Level",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        icon="mdi:propane-tank",
+        value_fn=lambda reading: reading.tank_level_percent,
+    ),
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_GALLONS_REMAINING,
+        name="Gallons Remaining",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        icon="mdi:gauge",
+        value_fn=lambda reading: reading.gallons_remaining,
+    ),
+    # No state class as tank capacity is static
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_TANK_CAPACITY,
+        name="Tank Capacity",
+        native_unit_of_measurement=UnitOfVolume.GALLONS,
+        icon="mdi:propane-tank",
+        value_fn=lambda reading: reading.tank_capacity,
+    ),
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_FUEL_TYPE,
+        name="Fuel Type",
+        icon="mdi:fuel",
+        value_fn=lambda reading: reading.fuel_type,
+    ),
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_LAST_DELIVERY_DATE,
+        name="Last Delivery Date",
+        device_class=SensorDeviceClass.DATE,
+        icon="mdi:calendar-clock",
+        value_fn=lambda reading: reading.last_delivery_date,
+    ),
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_READING_DATE,
+        name="Reading Date",
+        device_class=SensorDeviceClass.DATE,
+        icon="mdi:calendar-check",
+        value_fn=lambda reading: reading.reading_date,
+    ),
+    MyFuelPortalSensorEntityDescription(
+        key=ATTR_CURRENT_PRICE,
+        name="Current Price",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="$/gal",
+        icon="mdi:currency-usd",
+        value_fn=lambda reading: reading.current_price,
+    ),
+)
 
 
-class TankLevelSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of tank level percentage sensor."""
+@dataclass(frozen=True, kw_only=True)
+class MyFuelPortalForecastSensorEntityDescription(SensorEntityDescription):
+    """Describes a MyFuelPortal consumption forecast sensor."""
+
+    forecast_fn: Callable[[UsageForecast], StateType | date]
+
+
+def _round(value: float | None, digits: int) -> float | None:
+    """Round a forecast value, keeping None."""
+    return None if value is None else round(value, digits)
+
+
+FORECAST_SENSOR_DESCRIPTIONS: tuple[MyFuelPortalForecastSensorEntityDescription, ...] = (
+    MyFuelPortalForecastSensorEntityDescription(
+        key="daily_usage",
+        name="Daily Usage",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=f"{UnitOfVolume.GALLONS}/d",
+        icon="mdi:chart-line",
+        forecast_fn=lambda forecast: _round(forecast.daily_usage, 2),
+    ),
+    MyFuelPortalForecastSensorEntityDescription(
+        key="days_until_reserve",
+        name="Days Until Reserve",
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        icon="mdi:calendar-alert",
+        forecast_fn=lambda forecast: _round(forecast.days_until_reserve, 1),
+    ),
+    MyFuelPortalForecastSensorEntityDescription(
+        key="projected_empty",
+        name="Projected Empty Date",
+        device_class=SensorDeviceClass.DATE,
+        icon="mdi:calendar-remove",
+        forecast_fn=lambda forecast: (
+            dt_util.as_local(forecast.empty_at).date() if forecast.empty_at else None
+        ),
+    ),
+)
 
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_tank_level"
-        
-        # Set the entity name
-        self._attr_name = "Tank Level"
-        
-        # Set sensor properties
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = PERCENTAGE
-        self._attr_icon = "mdi:propane-tank"
-        
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_TANK_LEVEL)
+@dataclass(frozen=True, kw_only=True)
+class MyFuelPortalMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a MyFuelPortal performance sensor."""
+
+    value_fn: Callable[[RefreshMetrics], StateType]
+
+
+def _last_ms(phase: str) -> Callable[[RefreshMetrics], StateType]:
+    """Return a function giving the last duration of a phase in ms."""
+
+    def _value(metrics: RefreshMetrics) -> StateType:
+        seconds = metrics.last(phase)
+        return None if seconds is None else round(seconds * 1000, 1)
+
+    return _value
+
+
+# Disabled by default; they change on every refresh
+METRIC_SENSOR_DESCRIPTIONS: tuple[MyFuelPortalMetricSensorEntityDescription, ...] = (
+    MyFuelPortalMetricSensorEntityDescription(
+        key="refresh_duration",
+        name="Refresh Duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_ms(PHASE_REFRESH),
+    ),
+    MyFuelPortalMetricSensorEntityDescription(
+        key="tank_fetch_duration",
+        name="Tank Fetch Duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_ms(PHASE_TANK_FETCH),
+    ),
+    MyFuelPortalMetricSensorEntityDescription(
+        key="tank_parse_duration",
+        name="Tank Parse Duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_ms(PHASE_TANK_PARSE),
+    ),
+    MyFuelPortalMetricSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes Received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.counters.get(COUNTER_BYTES_RECEIVED, 0),
+    ),
+    MyFuelPortalMetricSensorEntityDescription(
+        key="reauth_count",
+        name="Re-authentications",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.counters.get(COUNTER_REAUTHS, 0),
+    ),
+    MyFuelPortalMetricSensorEntityDescription(
+        key="parse_fallbacks",
+        name="Parse Fallbacks",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.counters.get(COUNTER_PARSE_FALLBACKS, 0),
+    ),
+)
 
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
 
+class MyFuelPortalSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
+    """A sensor of one tank, described by an entity description."""
 
-class GallonsRemainingSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of gallons remaining sensor."""
+    entity_description: MyFuelPortalSensorEntityDescription
 
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
+    def __init__(
+        self,
+        coordinator: MyCoordinator,
+        entry: ConfigEntry,
+        tank_id: str,
+        primary: bool,
+        device_info: DeviceInfo,
+        description: MyFuelPortalSensorEntityDescription,
+    ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
-        
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_gallons_remaining"
-        
-        # Set the entity name
-        self._attr_name = "Gallons Remaining"
-        
-        # Set sensor properties
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = UnitOfVolume.GALLONS
-        self._attr_icon = "mdi:gauge"
-        
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
-
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_GALLONS_REMAINING)
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
+        self.entity_description = description
+        self._tank_id = tank_id
+        # Last written availability, value and snapshot flag
+        self._written: tuple[Any, ...] | None = None
 
-class TankCapacitySensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of tank capacity sensor."""
-
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        
         # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_tank_capacity"
-        
-        # Set the entity name
-        self._attr_name = "Tank Capacity"
-        
-        # Set sensor properties (no state class as tank capacity is static)
-        self._attr_native_unit_of_measurement = UnitOfVolume.GALLONS
-        self._attr_icon = "mdi:propane-tank"
-        
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
+        if primary:
+            self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        else:
+            self._attr_unique_id = f"{entry.entry_id}_{tank_id}_{description.key}"
 
-    @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_TANK_CAPACITY)
+        self._attr_device_info = device_info
 
     @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
-
-class FuelTypeSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of fuel type sensor."""
-
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_fuel_type"
-
-        # Set the entity name
-        self._attr_name = "Fuel Type"
-
-        # Set sensor properties (no state class or unit for string values)
-        self._attr_icon = "mdi:fuel"
-
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
+    def reading(self) -> TankReading | None:
+        """Return the reading of this sensor's tank."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get(self._tank_id)
 
     @property
-    def native_value(self) -> str | None:
+    def native_value(self) -> StateType | date:
         """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_FUEL_TYPE)
+        reading = self.reading
+        if reading is None:
+            return None
+        return self.entity_description.value_fn(reading)
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
-
-class LastDeliveryDateSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of last delivery date sensor."""
-
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_last_delivery_date"
-
-        # Set the entity name
-        self._attr_name = "Last Delivery Date"
-
-        # Set sensor properties (no state class or unit for date strings)
-        self._attr_icon = "mdi:calendar-clock"
-
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
-
-    @property
-    def native_value(self) -> str | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_LAST_DELIVERY_DATE)
+        return self.coordinator.last_update_success and self.reading is not None
 
     @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return when the data was fetched, and if it is a restored snapshot."""
+        fetched = self.coordinator.data_fetched
+        return {
+            ATTR_DATA_FETCHED: fetched.isoformat() if fetched else None,
+            ATTR_FROM_SNAPSHOT: self.coordinator.from_snapshot,
+        }
 
-class ReadingDateSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of tank reading date sensor."""
+    def _state_key(self) -> tuple[Any, ...]:
+        """Return what a state write would change."""
+        return (self.available, self.native_value, self.coordinator.from_snapshot)
 
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity was added."""
+        await super().async_added_to_hass()
+        self._written = self._state_key()
 
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_reading_date"
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if this sensor's value or availability changed.
 
-        # Set the entity name
-        self._attr_name = "Reading Date"
+        The data_fetched attribute therefore tells when the current value
+        was fetched, not when the portal was last polled.
+        """
+        state = self._state_key()
+        if state == self._written:
+            return
+        self._written = state
+        self.async_write_ha_state()
 
-        # Set sensor properties (no state class or unit for date strings)
-        self._attr_icon = "mdi:calendar-check"
 
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
+class MyFuelPortalForecastSensor(MyFuelPortalSensor):
+    """A consumption forecast of one tank, fitted on its reading history."""
 
-    @property
-    def native_value(self) -> str | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_READING_DATE)
+    entity_description: MyFuelPortalForecastSensorEntityDescription  # type: ignore[assignment]
 
     @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
-
-
-class CurrentPriceSensor(CoordinatorEntity[MyCoordinator], SensorEntity):
-    """Representation of current fuel price sensor."""
-
-    def __init__(self, coordinator: MyCoordinator, entry: ConfigEntry) -> None:
+    def native_value(self) -> StateType | date:
+        """Return the forecast value, None until there are enough readings."""
+        forecast = self.coordinator.forecasts.get(self._tank_id)
+        if forecast is None:
+            return None
+        return self.entity_description.forecast_fn(forecast)
+
+
+class MyFuelPortalMetricSensor(SensorEntity):
+    """A performance counter of the account's portal client."""
+
+    _attr_should_poll = False
+    entity_description: MyFuelPortalMetricSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: MyCoordinator,
+        entry: ConfigEntry,
+        device_info: DeviceInfo,
+        description: MyFuelPortalMetricSensorEntityDescription,
+    ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-
-        # Set the unique ID for the entity
-        self._attr_unique_id = f"{entry.entry_id}_current_price"
-
-        # Set the entity name
-        self._attr_name = "Current Price"
-
-        # Set sensor properties
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_native_unit_of_measurement = "$/gal"
-        self._attr_icon = "mdi:currency-usd"
-
-        # Set the device info to group entities under a device
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": entry.title,
-            "manufacturer": "MyFuelPortal",
-            "model": "Propane Tank Monitor",
-        }
+        self.entity_description = description
+        self._coordinator = coordinator
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info
 
     @property
-    def native_value(self) -> float | None:
-        """Return the state of the sensor."""
-        return self.coordinator.data.get(ATTR_CURRENT_PRICE)
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self.coordinator.last_update_success
+    def native_value(self) -> StateType:
+        """Return the counter value."""
+        return self.entity_description.value_fn(self._coordinator.api.metrics)
+
+    async def async_added_to_hass(self) -> None:
+        """Update the state after every refresh."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_METRICS_UPDATED.format(self._coordinator.entry.entry_id),
+                self.async_write_ha_state,
+            )
+        )
+
+
+def tank_device_info(entry: ConfigEntry, tank_id: str, primary: bool) -> DeviceInfo:
+    """Return the device info of a tank."""
+    if primary:
+        return DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="MyFuelPortal",
+            model="Propane Tank Monitor",
+        )
+    return DeviceInfo(
+        identifiers={(DOMAIN, f"{entry.entry_id}_{tank_id}")},
+        name=f"{entry.title} Tank {tank_id}",
+        manufacturer="MyFuelPortal",
+        model="Propane Tank Monitor",
+    )
@@ -0,0 +1,254 @@
+"""Long-term statistics import for MyFuelPortal."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime
+from itertools import islice
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import PERCENTAGE, UnitOfVolume
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .history import HistoryPoint
+from .models import Delivery
+
+if TYPE_CHECKING:
+    from .coordinator import MyCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statistic rows handed to the recorder per call
+STATISTICS_BATCH_SIZE = 500
+
+# Reading fields imported as hourly mean, min and max
+_READING_STATISTICS: tuple[
+    tuple[str, str, str, Callable[[HistoryPoint], float | None]], ...
+] = (
+    ("tank_level", "Tank Level", PERCENTAGE, lambda point: point.level),
+    (
+        "gallons_remaining",
+        "Gallons Remaining",
+        UnitOfVolume.GALLONS,
+        lambda point: point.gallons,
+    ),
+    ("current_price", "Current Price", "$/gal", lambda point: point.price),
+)
+
+
+def statistic_id(entry_id: str, tank_id: str | None, key: str) -> str:
+    """Return the external statistic ID of a tank or account value."""
+    parts = [entry_id, key] if tank_id is None else [entry_id, tank_id, key]
+    return f"{DOMAIN}:{slugify('_'.join(parts))}"
+
+
+async def async_import_statistics(
+    hass: HomeAssistant, coordinator: MyCoordinator
+) -> int:
+    """Import the reading and delivery history into long-term statistics.
+
+    Readings become hourly mean, min and max rows; deliveries become
+    running sums of gallons and cost, and the price per gallon they were
+    billed at. The portal only shows the current reading of a tank, so
+    readings go back to when the integration was set up, while deliveries
+    and their prices go back as far as the synced delivery history.
+
+    Reading statistics continue from the last hour already imported, which
+    is imported again as it may have gained readings since. The few
+    delivery rows are rebuilt in full every time, so a delivery that shows
+    up later with an earlier date still lands on its day and in every sum
+    after it. The recorder replaces rows with the same start, so the
+    import can be run again at any time without duplicating rows.
+
+    Returns:
+        The number of statistic rows handed to the recorder
+
+    """
+    entry = coordinator.entry
+    imported = 0
+    for tank_id, history in coordinator.history.tanks.items():
+        for key, name, unit, value_fn in _READING_STATISTICS:
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{entry.title} {tank_id} {name}",
+                source=DOMAIN,
+                statistic_id=statistic_id(entry.entry_id, tank_id, key),
+                unit_of_measurement=unit,
+            )
+            last_start = await _async_last_start(hass, metadata)
+            rows = _hourly_rows(history, value_fn, last_start)
+            imported += _add_batched(hass, metadata, rows)
+
+    currency = hass.config.currency
+    delivery_statistics: tuple[
+        tuple[str, str, str, Callable[[Delivery], float | None]], ...
+    ] = (
+        ("delivered_gallons", "Delivered Gallons", UnitOfVolume.GALLONS, _delivered_gallons),
+        ("delivery_cost", "Delivery Cost", currency, _delivery_cost),
+    )
+    for key, name, unit, sum_fn in delivery_statistics:
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{entry.title} {name}",
+            source=DOMAIN,
+            statistic_id=statistic_id(entry.entry_id, None, key),
+            unit_of_measurement=unit,
+        )
+        rows = _sum_rows(coordinator.deliveries.deliveries, sum_fn)
+        imported += _add_batched(hass, metadata, rows)
+
+    metadata = StatisticMetaData(
+        has_mean=True,
+        has_sum=False,
+        name=f"{entry.title} Delivery Price",
+        source=DOMAIN,
+        statistic_id=statistic_id(entry.entry_id, None, "delivery_price"),
+        # Priced in the currency of the delivery cost
+        unit_of_measurement=f"{currency}/{UnitOfVolume.GALLONS}",
+    )
+    rows = _price_rows(coordinator.deliveries.deliveries)
+    imported += _add_batched(hass, metadata, rows)
+
+    _LOGGER.debug("Imported %d statistic rows for %s", imported, entry.title)
+    return imported
+
+
+async def _async_last_start(
+    hass: HomeAssistant, metadata: StatisticMetaData
+) -> float | None:
+    """Return the start of the last imported row of a statistic."""
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, metadata["statistic_id"], True, set()
+    )
+    if not (rows := last.get(metadata["statistic_id"])):
+        return None
+    return rows[0]["start"]
+
+
+def _add_batched(
+    hass: HomeAssistant, metadata: StatisticMetaData, rows: Iterable[StatisticData]
+) -> int:
+    """Hand rows to the recorder in batches and return how many there were."""
+    count = 0
+    iterator = iter(rows)
+    while batch := list(islice(iterator, STATISTICS_BATCH_SIZE)):
+        async_add_external_statistics(hass, metadata, batch)
+        count += len(batch)
+    return count
+
+
+def _hour(timestamp: float) -> datetime:
+    """Return the start of the UTC hour of a timestamp."""
+    return dt_util.utc_from_timestamp(timestamp).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def _hourly_rows(
+    points: Iterable[HistoryPoint],
+    value_fn: Callable[[HistoryPoint], float | None],
+    since: float | None,
+) -> Iterator[StatisticData]:
+    """Return an hourly mean, min and max row for each hour with readings.
+
+    Hours before the one starting at since are skipped.
+    """
+    start: datetime | None = None
+    values: list[float] = []
+    for point in points:
+        value = value_fn(point)
+        if value is None:
+            continue
+        hour = _hour(point.timestamp)
+        if since is not None and hour.timestamp() < since:
+            continue
+        if hour != start:
+            if values:
+                yield _mean_row(start, values)
+            start = hour
+            values = []
+        values.append(value)
+    if values:
+        yield _mean_row(start, values)
+
+
+def _mean_row(start: datetime | None, values: list[float]) -> StatisticData:
+    """Return the row of one hour of readings."""
+    return StatisticData(
+        start=start,
+        mean=sum(values) / len(values),
+        min=min(values),
+        max=max(values),
+    )
+
+
+def _delivered_gallons(delivery: Delivery) -> float | None:
+    """Return the gallons of a delivery."""
+    return delivery.gallons
+
+
+def _delivery_cost(delivery: Delivery) -> float | None:
+    """Return the cost of a delivery, from its price when no total is shown."""
+    if delivery.amount is not None:
+        return delivery.amount
+    if delivery.gallons is not None and delivery.price is not None:
+        return round(delivery.gallons * delivery.price, 2)
+    return None
+
+
+def _delivery_start(delivery_date: date) -> datetime:
+    """Return the start of the local day of a delivery, as a UTC hour."""
+    return dt_util.as_utc(dt_util.start_of_local_day(delivery_date))
+
+
+def _sum_rows(
+    deliveries: Iterable[Delivery],
+    value_fn: Callable[[Delivery], float | None],
+) -> Iterator[StatisticData]:
+    """Return a running sum row for each day with deliveries."""
+    start: datetime | None = None
+    state = 0.0
+    total = 0.0
+    for delivery in deliveries:
+        value = value_fn(delivery)
+        if value is None:
+            continue
+        day = _delivery_start(delivery.delivery_date)
+        if day != start:
+            if start is not None:
+                yield StatisticData(start=start, state=state, sum=total)
+            start = day
+            state = 0.0
+        state += value
+        total += value
+    if start is not None:
+        yield StatisticData(start=start, state=state, sum=total)
+
+
+def _price_rows(deliveries: Iterable[Delivery]) -> Iterator[StatisticData]:
+    """Return a mean, min and max price row for each day with priced deliveries."""
+    start: datetime | None = None
+    prices: list[float] = []
+    for delivery in deliveries:
+        if delivery.price is None:
+            continue
+        day = _delivery_start(delivery.delivery_date)
+        if day != start:
+            if prices:
+                yield _mean_row(start, prices)
+            start = day
+            prices = []
+        prices.append(delivery.price)
+    if prices:
+        yield _mean_row(start, prices)
@@ -0,0 +1,242 @@
+"""Rate limiting and circuit breaking for requests to the portal."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+import weakref
+
+from .exceptions import CircuitOpenError
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class TokenBucket:
+    """Limit the request rate, allowing short bursts."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Largest number of tokens, i.e. the burst size
+
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def async_acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        # The lock keeps waiters in arrival order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the bucket state for diagnostics."""
+        self._refill()
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self._tokens, 2),
+        }
+
+
+class CircuitBreaker:
+    """Stop sending requests to a host that keeps failing.
+
+    The breaker is closed while requests succeed. After failure_threshold
+    consecutive failures it opens and requests fail right away without
+    reaching the host. Once the backoff has passed it is half-open: a
+    single trial request goes through, and closes the breaker if it
+    succeeds or opens it again with twice the backoff if it fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        base_backoff: float = 60,
+        max_backoff: float = 3600,
+    ) -> None:
+        """Initialize the breaker, with backoffs in seconds."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.retry_at: float | None = None
+        self._trial_running = False
+
+    def before_request(self) -> None:
+        """Check that a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a
+                trial request already running
+
+        """
+        if self.state == STATE_CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == STATE_OPEN:
+            if self.retry_at is not None and now < self.retry_at:
+                raise CircuitOpenError(
+                    f"Portal unavailable, retrying in {self.retry_at - now:.0f} s"
+                )
+            self.state = STATE_HALF_OPEN
+            _LOGGER.debug("Circuit half-open, sending a trial request")
+        if self._trial_running:
+            raise CircuitOpenError("Portal unavailable, trial request running")
+        self._trial_running = True
+
+    def record_success(self) -> None:
+        """Record a request that reached a healthy host."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Portal is reachable again, circuit closed")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.retry_at = None
+        self._trial_running = False
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Record a failed request, opening the breaker if needed.
+
+        Args:
+            retry_after: Seconds the host asked us to wait, if any
+
+        """
+        self.failures += 1
+        self._trial_running = False
+        if self.state == STATE_OPEN:
+            # A request sent before the breaker opened
+            return
+        if self.state == STATE_CLOSED and self.failures < self.failure_threshold:
+            if retry_after is None:
+                return
+        backoff = min(self.base_backoff * 2**self.opened, self.max_backoff)
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_backoff))
+        self.opened += 1
+        self.state = STATE_OPEN
+        self.retry_at = time.monotonic() + backoff
+        _LOGGER.warning(
+            "Portal failed %d times in a row, pausing requests for %.0f s",
+            self.failures,
+            backoff,
+        )
+
+    def cancel_request(self) -> None:
+        """Forget a request that was allowed but never sent."""
+        self._trial_running = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.opened,
+            "retry_in": (
+                max(0.0, round(self.retry_at - time.monotonic(), 1))
+                if self.retry_at is not None
+                else None
+            ),
+        }
+
+
+class HostGuard:
+    """Rate limiter and circuit breaker shared by all clients of a host."""
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        failure_threshold: int = 5,
+        base_backoff: float = 60,
+        max_backoff: float = 3600,
+    ) -> None:
+        """Initialize the guard."""
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, base_backoff, max_backoff)
+
+    async def async_before_request(self) -> None:
+        """Wait until a request may be sent to the host.
+
+        Raises:
+            CircuitOpenError: If the host is considered down
+
+        """
+        self.breaker.before_request()
+        try:
+            await self.limiter.async_acquire()
+        except asyncio.CancelledError:
+            # Don't keep the half-open trial reserved for a cancelled request
+            self.breaker.cancel_request()
+            raise
+
+    def record_response(self, status: int, retry_after: str | None = None) -> None:
+        """Record the outcome of a request from its HTTP status."""
+        if status == 429 or status >= 500:
+            self.breaker.record_failure(_parse_retry_after(retry_after))
+        else:
+            self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        """Record a request that failed before a response arrived."""
+        self.breaker.record_failure()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the guard state for diagnostics."""
+        return {
+            "circuit_breaker": self.breaker.as_dict(),
+            "rate_limiter": self.limiter.as_dict(),
+        }
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds of a Retry-After header, if given as seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+# Guards hold asyncio locks, which belong to one event loop, so each loop
+# gets its own guards
+_GUARDS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[str, HostGuard]
+] = weakref.WeakKeyDictionary()
+
+
+def host_guard(host: str) -> HostGuard:
+    """Return the guard shared by every client of a host on the running loop.
+
+    Raises:
+        RuntimeError: If no event loop is running
+
+    """
+    guards = _GUARDS.setdefault(asyncio.get_running_loop(), {})
+    if host not in guards:
+        guards[host] = HostGuard()
+    return guards[host]
@@ -0,0 +1,385 @@
+"""Poll many MyFuelPortal accounts from the command line.
+
+Run from the repository root:
+
+    python -m tools.poll_accounts accounts.csv > readings.jsonl
+    python -m tools.poll_accounts accounts.csv --concurrency 20 --output readings.jsonl
+    python -m tools.poll_accounts accounts.jsonl --parquet readings/
+
+The accounts file is a CSV file with ``email`` and ``password`` columns and
+an optional ``base_url`` column, or a JSON lines file (``.jsonl``) of
+objects with the same keys. Accounts are polled concurrently, at most
+``--concurrency`` at once, over one shared connection pool, and each portal
+host gets one rate limiter and circuit breaker, like in Home Assistant.
+
+Every tank reading is written as a JSON line as soon as its account has
+been polled, and an account that fails is written as a line with the error.
+With ``--parquet`` the rows are appended to a Parquet dataset directory
+instead, as a new file per run, which needs pyarrow to be installed.
+
+Only the API client is used, so Home Assistant does not need to be
+installed. The exit code is 1 when any account failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+from datetime import date, datetime, timezone
+import json
+import logging
+from pathlib import Path
+import sys
+import time
+from typing import IO, Any, NamedTuple
+
+from benchmarks import register_client_package
+
+register_client_package()
+
+# pylint: disable=wrong-import-position
+import aiohttp  # noqa: E402
+from yarl import URL  # noqa: E402
+
+from custom_components.myfuelportal.api import (  # noqa: E402
+    MyFuelPortalAPI,
+    MyFuelPortalAPIError,
+    create_connector,
+)
+from custom_components.myfuelportal.models import TankReading  # noqa: E402
+from custom_components.myfuelportal.throttle import HostGuard  # noqa: E402
+
+# pylint: enable=wrong-import-position
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://kbjohnson.myfuelportal.com"
+DEFAULT_CONCURRENCY = 10
+# Rows buffered before they are written as a Parquet row group
+DEFAULT_BATCH_SIZE = 1000
+
+# Columns of every row, in order
+COLUMNS = (
+    "polled_at",
+    "email",
+    "tank_id",
+    *TankReading.__slots__,
+    "error",
+)
+
+
+class Account(NamedTuple):
+    """Credentials of one account to poll."""
+
+    email: str
+    password: str
+    base_url: str
+
+
+def read_accounts(path: Path, default_base_url: str) -> list[Account]:
+    """Read the accounts of a CSV or JSON lines file.
+
+    Raises:
+        ValueError: If an account has no email or password
+
+    """
+    with path.open(encoding="utf-8", newline="") as file:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            records = [
+                (number, json.loads(line))
+                for number, line in enumerate(file, 1)
+                if line.strip()
+            ]
+        else:
+            # Line 1 is the header
+            records = list(enumerate(csv.DictReader(file), 2))
+
+    accounts = []
+    for number, record in records:
+        email = (record.get("email") or "").strip()
+        password = record.get("password") or ""
+        if not email or not password:
+            raise ValueError(f"{path}:{number}: email and password are required")
+        base_url = (record.get("base_url") or "").strip() or default_base_url
+        accounts.append(Account(email, password, base_url))
+    return accounts
+
+
+def _json_default(value: Any) -> str:
+    """Serialize the dates of a row."""
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class JsonLinesOutput:
+    """Write rows as JSON lines, flushed after each account."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        """Initialize the output."""
+        self._stream = stream
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Write the rows of one account."""
+        for row in rows:
+            self._stream.write(json.dumps(row, default=_json_default) + "\n")
+        self._stream.flush()
+
+    def close(self) -> None:
+        """Close the stream, unless it is stdout."""
+        if self._stream is not sys.stdout:
+            self._stream.close()
+
+
+class ParquetOutput:
+    """Append rows to a Parquet dataset directory, as a new file per run.
+
+    Rows are buffered and written as row groups of batch_size rows, so
+    memory stays bounded however many accounts are polled.
+    """
+
+    def __init__(self, directory: Path, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """Initialize the output.
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+
+        """
+        try:
+            # pylint: disable-next=import-outside-toplevel
+            import pyarrow as pa
+
+            # pylint: disable-next=import-outside-toplevel
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise RuntimeError("Writing Parquet needs pyarrow to be installed") from err
+        self._pa = pa
+        self._pq = pq
+        self._schema = pa.schema(
+            [
+                ("polled_at", pa.timestamp("s", tz="UTC")),
+                ("email", pa.string()),
+                ("tank_id", pa.string()),
+                ("tank_level_percent", pa.float64()),
+                ("gallons_remaining", pa.float64()),
+                ("tank_capacity", pa.float64()),
+                ("fuel_type", pa.string()),
+                ("last_delivery_date", pa.date32()),
+                ("reading_date", pa.date32()),
+                ("current_price", pa.float64()),
+                ("error", pa.string()),
+            ]
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = directory / f"readings-{stamp}.parquet"
+        suffix = 1
+        while path.exists():
+            suffix += 1
+            path = directory / f"readings-{stamp}-{suffix}.parquet"
+        self.path = path
+        self._batch_size = batch_size
+        self._rows: list[dict[str, Any]] = []
+        self._writer: Any = None
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Buffer the rows of one account, writing a row group when full."""
+        self._rows.extend(rows)
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write the buffered rows as a row group."""
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(
+            self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        )
+        self._rows = []
+
+    def close(self) -> None:
+        """Write the remaining rows and close the file."""
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+async def async_poll_account(
+    account: Account,
+    connector: aiohttp.BaseConnector,
+    guard: HostGuard,
+    parser_backend: str | None = None,
+) -> list[dict[str, Any]]:
+    """Log in to an account and return a row per tank, or an error row."""
+    api = MyFuelPortalAPI(
+        account.email,
+        account.password,
+        base_url=account.base_url,
+        parser_backend=parser_backend,
+        connector=connector,
+        guard=guard,
+    )
+    polled_at = datetime.now(timezone.utc).replace(microsecond=0)
+    try:
+        # The login lands on the Tank page, which is parsed without another
+        # request
+        await api.async_login()
+        tanks = await api.async_get_tank_data()
+    except MyFuelPortalAPIError as err:
+        _LOGGER.warning("Failed to poll %s: %s", account.email, err)
+        row = dict.fromkeys(COLUMNS)
+        row.update(
+            polled_at=polled_at,
+            email=account.email,
+            error=f"{type(err).__name__}: {err}",
+        )
+        return [row]
+    finally:
+        await api.async_close()
+
+    return [
+        {
+            "polled_at": polled_at,
+            "email": account.email,
+            "tank_id": tank_id,
+            **{name: getattr(reading, name) for name in TankReading.__slots__},
+            "error": None,
+        }
+        for tank_id, reading in tanks.items()
+    ]
+
+
+async def async_poll_accounts(
+    accounts: list[Account],
+    output: JsonLinesOutput | ParquetOutput,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    rate: float = 1.0,
+    burst: int = 5,
+    parser_backend: str | None = None,
+) -> tuple[int, int]:
+    """Poll the accounts, writing the rows of each as soon as it is done.
+
+    Returns:
+        The number of accounts that failed, and of tanks read
+
+    """
+    guards: dict[str, HostGuard] = {}
+    for account in accounts:
+        host = URL(account.base_url).host or account.base_url
+        guards.setdefault(host, HostGuard(rate=rate, burst=burst))
+    connector = create_connector(limit_per_host=concurrency)
+    pending = iter(accounts)
+    failed = 0
+    tanks = 0
+
+    async def _async_worker() -> None:
+        nonlocal failed, tanks
+        # Workers share the iterator, so each account is polled once
+        for account in pending:
+            host = URL(account.base_url).host or account.base_url
+            rows = await async_poll_account(
+                account, connector, guards[host], parser_backend
+            )
+            if rows and rows[0]["error"] is not None:
+                failed += 1
+            else:
+                tanks += len(rows)
+            output.write(rows)
+
+    try:
+        await asyncio.gather(
+            *(_async_worker() for _ in range(min(concurrency, len(accounts))))
+        )
+    finally:
+        await connector.close()
+    return failed, tanks
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Poll the accounts of a file and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("accounts", type=Path, help="CSV or JSON lines file of accounts")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="accounts polled at once, and connections per portal host",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=DEFAULT_BASE_URL,
+        help="portal of the accounts without a base_url",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1.0, help="requests per second to each portal host"
+    )
+    parser.add_argument("--burst", type=int, default=5, help="requests sent at once after a pause")
+    parser.add_argument(
+        "--parser-backend", choices=("auto", "html.parser", "lxml"), default=None
+    )
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
+        "--output", type=Path, help="append JSON lines to this file instead of stdout"
+    )
+    output_group.add_argument(
+        "--parquet", type=Path, metavar="DIRECTORY", help="append rows to a Parquet dataset"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="rows per Parquet row group",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    try:
+        accounts = read_accounts(args.accounts, args.base_url)
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+
+    output: JsonLinesOutput | ParquetOutput
+    if args.parquet is not None:
+        try:
+            output = ParquetOutput(args.parquet, args.batch_size)
+        except RuntimeError as err:
+            parser.error(str(err))
+    elif args.output is not None:
+        output = JsonLinesOutput(args.output.open("a", encoding="utf-8"))
+    else:
+        output = JsonLinesOutput(sys.stdout)
+
+    start = time.perf_counter()
+    try:
+        failed, tanks = asyncio.run(
+            async_poll_accounts(
+                accounts,
+                output,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                burst=args.burst,
+                parser_backend=args.parser_backend,
+            )
+        )
+    finally:
+        output.close()
+    print(
+        f"Polled {len(accounts) - failed} of {len(accounts)} accounts, "
+        f"{tanks} tanks, in {time.perf_counter() - start:.1f} s",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())